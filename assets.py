@@ -0,0 +1,141 @@
+# assets.py
+"""Image assets for the Big Red R!sk window
+
+Every image is read on a background thread as soon as preload() is
+called, so the file I/O and any conversion happen while Tk is still
+starting up and the board is being drawn. Images that are not binary
+PPM (P6) files are converted once and kept in .cache/assets under a hash
+of their contents, so later runs read the converted copy directly.
+
+Tk must only be used from the main thread, so photos are made there:
+either when the window is idle (see warmUp) or, at the latest, the first
+time image() is asked for one."""
+
+import os
+import threading
+from graphics import *
+from graphics import _newPhoto, _parsePPM, _headless
+
+assetDir = os.path.dirname(os.path.abspath(__file__))
+cacheDir = os.path.join(assetDir, ".cache", "assets")
+
+_data = {}     # file name -> P6 data, filled by the loader thread
+_ready = {}    # file name -> threading.Event set once _data or _errors has it
+_errors = {}   # file name -> the exception the loader thread hit
+_images = {}   # (file name, headless) -> Image with its photo made
+_lock = threading.Lock()
+
+
+def assetPath(name):
+    # Asset names are matched without regard to case, so "end.ppm" finds
+    # end.PPM on case sensitive file systems too
+    path = os.path.join(assetDir, name)
+    if os.path.exists(path):
+        return path
+    lower = name.lower()
+    for entry in os.listdir(assetDir):
+        if entry.lower() == lower:
+            return os.path.join(assetDir, entry)
+    raise GraphicsError("missing image file: " + name)
+
+
+def toP6(data, name="<data>"):
+    """Return the contents of a PPM file as a binary (P6) PPM with maxval
+    255. Files that are already in that form are returned as is."""
+    header = data[:64].split()
+    if len(header) >= 4 and header[0] == b"P6" and header[3] == b"255":
+        return data
+    width, height, pixels = _parsePPM(data, name)
+    return "P6\n{} {}\n255\n".format(width, height).encode() + bytes(pixels)
+
+
+def readAsset(name):
+    """Return the P6 data for an asset, converting it through the cache if
+    the file is not P6 already"""
+    import hashlib
+    with open(assetPath(name), "rb") as f:
+        data = f.read()
+    converted = toP6(data, name)
+    if converted is data:
+        return data
+    cached = os.path.join(cacheDir, hashlib.sha1(data).hexdigest() + ".ppm")
+    try:
+        with open(cached, "rb") as f:
+            return f.read()
+    except (IOError, OSError):
+        pass
+    try:
+        if not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+        tmp = cached + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(converted)
+        os.rename(tmp, cached)
+    except (IOError, OSError):
+        pass # no cache this time
+    return converted
+
+
+def _load(names):
+    for name in names:
+        try:
+            _data[name] = readAsset(name)
+        except Exception as e:
+            _errors[name] = e # image() raises it
+        finally:
+            _ready[name].set()
+
+
+def preload(names):
+    """Start reading the named assets on a background thread. Names that
+    are already loaded or loading are skipped."""
+    with _lock:
+        names = [name for name in names if name not in _ready]
+        for name in names:
+            _ready[name] = threading.Event()
+    if names:
+        loader = threading.Thread(target=_load, args=(names,),
+                                  name="asset loader")
+        loader.daemon = True
+        loader.start()
+
+
+def image(name, win=None):
+    """Return an Image of the asset, made for the backend of win (or the
+    default backend). The same Image is returned every time, so draw it
+    through Image(p, image(name)) rather than drawing it directly."""
+    if win:
+        headless = win.headless
+    else:
+        headless = _headless
+    key = (name, headless)
+    if key not in _images:
+        preload([name])
+        _ready[name].wait()
+        if name in _errors:
+            raise _errors[name]
+        data = _data[name]
+        img = Image(Point(0,0), 0, 0)
+        img.img = _newPhoto(data=data, headless=headless)
+        img.file = name
+        _images[key] = img
+    return _images[key]
+
+
+def warmUp(win, names, delay=50):
+    """Make photos for the named assets whenever win is idle, one per
+    visit to the event loop, so that image() has them ready"""
+    names = list(names)
+    def step():
+        if win.isClosed() or not names:
+            return
+        name = names[0]
+        preload([name]) # again if the asset has been forgotten since
+        if _ready[name].is_set():
+            names.pop(0)
+            image(name, win)
+            win.after_idle(step)
+        else:
+            win.after(delay, step) # still loading
+    preload(names)
+    win.after_idle(step)
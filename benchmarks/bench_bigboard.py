@@ -0,0 +1,111 @@
+"""riskgraphics on a large generated board.
+
+Writes a board file with SIZE territories laid out in a grid (bordering
+their neighbors above, below and to the sides, in continents of 5 by 5)
+and times, on it: loading the board file, drawBoard with and without the
+static layer cache, hitTest, applySnapshot of a whole game state, and
+selecting a country (odds and highlights).
+
+    python3 benchmarks/bench_bigboard.py [size]
+
+Set GRAPHICS_BACKEND=headless to run without a display.
+"""
+
+import json, math, os, random, sys, tempfile, time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+players = ["Player one", "Player two", "Player three", "Player four"]
+
+
+def gridBoard(size):
+    # Territories fill x 2..98, y 26..74 (clear of the rest of the window)
+    columns = int(math.ceil(math.sqrt(size*2)))
+    rows = int(math.ceil(size/float(columns)))
+    width, height = 96.0/columns, 48.0/rows
+    def name(c, r):
+        return "T{}-{}".format(c, r)
+    cells = [(c, r) for r in range(rows) for c in range(columns)][:size]
+    taken = set(cells)
+    continents = {}
+    for c, r in cells:
+        x, y = 2 + c*width, 26 + r*height
+        borders = [name(*n) for n in ((c-1, r), (c+1, r), (c, r-1), (c, r+1)) if n in taken]
+        territory = {"name": name(c, r), "box": [x + 0.2, y + 0.2, x + width - 0.2,
+                                                 y + height - 0.8], "borders": borders}
+        continents.setdefault((c//5, r//5), []).append(territory)
+    data = []
+    for (cc, cr), territories in sorted(continents.items()):
+        x, y = 2 + cc*5*width, 26 + cr*5*height
+        data.append({"name": "C{}-{}".format(cc, cr), "bonus": len(territories)//5,
+                     "box": [x, y, x + 5*width, y + 5*height], "territories": territories})
+    return {"continents": data}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return 1000*(time.perf_counter() - start), result
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    handle, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(handle, "w") as f:
+        json.dump(gridBoard(size), f)
+    os.environ["RISK_BOARD"] = path
+    try:
+        ms, riskboard = timed(__import__, "riskboard") # loads RISK_BOARD
+        board = riskboard.board
+        print("{} territories".format(len(board.territories())))
+        print("  load board file      {:8.2f} ms (then {:.4f} ms)".format(
+            ms, timed(riskboard.load)[0]))
+        import riskgraphics
+        if os.path.exists(riskgraphics.staticLayerFile):
+            os.remove(riskgraphics.staticLayerFile)
+        ms, win = timed(riskgraphics.drawBoard)
+        print("  drawBoard, cold      {:8.2f} ms".format(ms))
+        win.close()
+        ms, win = timed(riskgraphics.drawBoard)
+        print("  drawBoard, cached    {:8.2f} ms".format(ms))
+
+        rng = random.Random(3110)
+        points = [(rng.uniform(0, 100), rng.uniform(0, 100)) for i in range(10000)]
+        start = time.perf_counter()
+        for x, y in points:
+            riskgraphics.hitTest(x, y)
+        print("  hitTest              {:8.2f} us".format(
+            1e6*(time.perf_counter() - start)/len(points)))
+
+        names = board.territories()
+        occupied = [(name, rng.choice(players), rng.randint(1, 30)) for name in names]
+        cards = [(player, 0) for player in players]
+        ms = timed(riskgraphics.applySnapshot, win, occupied, cards, 5, 1,
+                   players[0], "")[0]
+        print("  applySnapshot        {:8.2f} ms (then {:.2f} ms unchanged)".format(
+            ms, timed(riskgraphics.applySnapshot, win, occupied, cards, 5, 1,
+                      players[0], "")[0]))
+
+        # hold one big region so selecting in it highlights a lot
+        occupied = [(name, players[0] if i < len(names)//2 else rng.choice(players[1:]),
+                     rng.randint(1, 30)) for i, name in enumerate(names)]
+        riskgraphics.applySnapshot(win, occupied, cards, 5, 1, players[0], "")
+        win.flush()
+        times = []
+        for i in range(50):
+            country = names[rng.randrange(len(names)//2)]
+            # a country changes hands between selections, so the groups
+            # are worked out again every time
+            riskgraphics.paintCountry((names[0], players[i % 2], 1))
+            times.append(timed(riskgraphics.updateBoard, win, (country, True), None, cards,
+                               5, 1, None, players[0], "")[0])
+        times.sort()
+        print("  select a country     {:8.2f} ms median, {} highlighted".format(
+            times[len(times)//2], len(riskgraphics.highlighted)))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
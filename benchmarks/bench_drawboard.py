@@ -0,0 +1,42 @@
+"""Window-ready time of riskgraphics.drawBoard.
+
+Each run is a fresh interpreter that times drawBoard() plus a final
+update(). "cold" runs delete the static layer cache first, so the layers
+are compiled from GraphicsObjects as on a first launch; "warm" runs load
+the cached layers. Set GRAPHICS_BACKEND=headless to run without a display.
+
+    python3 benchmarks/bench_drawboard.py [runs]
+"""
+
+import os, subprocess, sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+layerCache = os.path.join(root, ".cache", "staticlayers.json") # see riskgraphics
+
+timer = """
+import time
+start = time.perf_counter()
+import riskgraphics
+win = riskgraphics.drawBoard()
+win.update()
+print(time.perf_counter() - start)
+"""
+
+
+def runOnce(cold):
+    if cold and os.path.exists(layerCache):
+        os.remove(layerCache)
+    out = subprocess.check_output([sys.executable, "-c", timer], cwd=root)
+    return float(out.decode().split()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, cold in [("cold", True), ("warm", False)]:
+        times = sorted(runOnce(cold) for i in range(runs))
+        print("{}: median {:.1f} ms  min {:.1f} ms".format(
+            name, 1000*times[len(times)//2], 1000*times[0]))
+
+
+if __name__ == "__main__":
+    main()
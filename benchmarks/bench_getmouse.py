@@ -0,0 +1,70 @@
+"""Click latency of GraphWin.getMouse: event-driven wait vs. the old polling.
+
+A synthetic click is injected with after() at a random delay and we measure
+the time from the click to getMouse returning, plus the CPU time burnt while
+waiting for it.
+
+    python3 benchmarks/bench_getmouse.py [clicks]
+"""
+
+import os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from graphics import *
+
+
+class FakeEvent:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def pollingGetMouse(win):
+    # GraphWin.getMouse before it became event driven, polling the
+    # window's event queue where it used to poll mouseX/mouseY
+    win.update()
+    win.events.clear()
+    while not win.events:
+        win.update()
+        if win.isClosed(): raise GraphicsError("getMouse in closed window")
+        time.sleep(.1)
+    return win.events.popleft().point
+
+
+def measure(win, getMouse, clicks, rng):
+    latencies = []
+    cpu = 0.0
+    for i in range(clicks):
+        clickedAt = []
+        def click():
+            clickedAt.append(time.perf_counter())
+            win._onClick(FakeEvent(10, 10))
+        win.after(rng.randint(50, 250), click)
+        cpu0 = time.process_time()
+        getMouse(win)
+        done = time.perf_counter()
+        cpu += time.process_time() - cpu0
+        latencies.append(done - clickedAt[0])
+    latencies.sort()
+    return {"mean_ms": 1000*sum(latencies)/len(latencies),
+            "p50_ms": 1000*latencies[len(latencies)//2],
+            "max_ms": 1000*latencies[-1],
+            "cpu_ms_per_wait": 1000*cpu/clicks}
+
+
+def main():
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    win = GraphWin("getMouse benchmark", 100, 100)
+    try:
+        for name, getMouse in [("polling", pollingGetMouse),
+                               ("event", GraphWin.getMouse)]:
+            stats = measure(win, getMouse, clicks, random.Random(3110))
+            print("{:8} mean {mean_ms:7.2f} ms  p50 {p50_ms:7.2f} ms  "
+                  "max {max_ms:7.2f} ms  cpu/wait {cpu_ms_per_wait:6.2f} ms"
+                  .format(name, **stats))
+    finally:
+        win.close()
+
+
+if __name__ == "__main__":
+    main()
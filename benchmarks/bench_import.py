@@ -0,0 +1,37 @@
+"""Import time of graphics and riskgraphics, from python -X importtime.
+
+Each module is imported in a fresh interpreter several times and the
+median cumulative import time is reported. Set GRAPHICS_BACKEND=headless
+to measure the headless configuration.
+
+    python3 benchmarks/bench_import.py [runs]
+"""
+
+import os, subprocess, sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importTime(module):
+    # -X importtime lines look like
+    #   import time: self [us] | cumulative | imported package
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                          "import " + module], cwd=root,
+                         stderr=subprocess.PIPE, check=True).stderr.decode()
+    for line in out.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError("no importtime line for " + module)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    for module in ["graphics", "riskgraphics"]:
+        times = sorted(importTime(module) for i in range(runs))
+        print("{:13} median {:6.1f} ms  min {:6.1f} ms".format(
+            module, times[len(times)//2]/1000.0, times[0]/1000.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Cost of drawing and undrawing many objects on one GraphWin.
+
+Draws N rectangles and undraws them in random order, once with the
+id-keyed GraphWin.items registry and once with the old list, whose
+list.remove made every undraw O(n).
+
+    python3 benchmarks/bench_items.py [objects]
+
+The old list lives in a Tk GraphWin subclass, so this needs a display.
+"""
+
+import os, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from graphics import *
+
+
+class ListGraphWin(GraphWin):
+
+    # GraphWin item bookkeeping before the registry
+    def __init__(self, *args, **kwargs):
+        GraphWin.__init__(self, *args, **kwargs)
+        self.items = []
+
+    def addItem(self, item):
+        self.items.append(item)
+
+    def delItem(self, item):
+        self.items.remove(item)
+
+    def redraw(self):
+        for item in self.items[:]:
+            item.undraw()
+            item.draw(self)
+        self.update()
+
+
+def measure(winClass, count, seed):
+    win = winClass("items benchmark", 200, 200, autoflush=False)
+    try:
+        shapes = [Rectangle(Point(i % 200, i // 200), Point(i % 200 + 1, i // 200 + 1))
+                  for i in range(count)]
+        order = list(shapes)
+        random.Random(seed).shuffle(order)
+
+        start = time.perf_counter()
+        for shape in shapes:
+            shape.draw(win)
+        drawn = time.perf_counter()
+        for shape in order:
+            shape.undraw()
+        undrawn = time.perf_counter()
+        return {"draw_s": drawn - start, "undraw_s": undrawn - drawn}
+    finally:
+        win.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    noDisplay = (GraphicsError, tk.TclError) if tk else GraphicsError
+    for name, winClass in [("list", ListGraphWin), ("registry", GraphWin)]:
+        try:
+            stats = measure(winClass, count, 3110)
+        except noDisplay as e:
+            sys.exit("bench_items needs a Tk display: {}".format(e))
+        print("{:9} {} objects: draw {draw_s:7.3f} s  undraw {undraw_s:7.3f} s"
+              .format(name, count, **stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Cost of reading and rewriting every pixel of a 1200x700 image.
+
+Tints a window-sized Image red, once pixel by pixel with getPixel and
+setPixel and once as a single buffer with getPixels and setPixels. The
+per-pixel pass only does the first ROWS rows and is scaled up to the
+whole frame, since a full pass takes minutes under Tk.
+
+    python3 benchmarks/bench_pixels.py [rows]
+
+Set GRAPHICS_BACKEND=headless to run without a display.
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from graphics import *
+
+WIDTH, HEIGHT = 1200, 700
+
+
+def tint(value):
+    return min(255, value + 64)
+
+
+def perPixel(img, rows):
+    start = time.perf_counter()
+    for y in range(rows):
+        for x in range(WIDTH):
+            r, g, b = img.getPixel(x, y)
+            img.setPixel(x, y, color_rgb(tint(r), g, b))
+    return (time.perf_counter() - start) * HEIGHT / rows
+
+
+def bulk(img):
+    start = time.perf_counter()
+    pixels = img.getPixels()
+    pixels[0::3] = bytearray(tint(r) for r in pixels[0::3])
+    img.setPixels(pixels)
+    return time.perf_counter() - start
+
+
+def bulkNumpy(img):
+    import numpy
+    start = time.perf_counter()
+    pixels = numpy.frombuffer(img.getPixels(), numpy.uint8).reshape(HEIGHT, WIDTH, 3)
+    pixels[:, :, 0] = numpy.minimum(pixels[:, :, 0].astype(numpy.uint16) + 64, 255)
+    img.setPixels(pixels)
+    return time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    img = Image(Point(0, 0), WIDTH, HEIGHT)
+    print("{}x{} frame".format(WIDTH, HEIGHT))
+    print("  getPixel/setPixel   {:8.3f} s (from {} rows)".format(perPixel(img, rows), rows))
+    print("  getPixels/setPixels {:8.3f} s".format(bulk(img)))
+    try:
+        print("  same, with NumPy    {:8.3f} s".format(bulkNumpy(img)))
+    except ImportError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
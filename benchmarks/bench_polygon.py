@@ -0,0 +1,71 @@
+"""Cost of converting polygon vertices to screen coordinates.
+
+For polygons of 10 to 10000 vertices, times the world to screen
+conversion done one vertex at a time with toScreen (as Polygon used to)
+and all at once with toScreenMany, in plain Python and with NumPy, and
+drawing the whole Polygon.
+
+    python3 benchmarks/bench_polygon.py
+
+Set GRAPHICS_BACKEND=headless to run without a display.
+"""
+
+import math, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import graphics
+from graphics import *
+
+
+def star(vertices):
+    # a spiky outline around the middle of the window
+    return [Point(50 + (30 + 10*(i % 2))*math.cos(2*math.pi*i/vertices),
+                  50 + (30 + 10*(i % 2))*math.sin(2*math.pi*i/vertices))
+            for i in range(vertices)]
+
+
+def best(func, repeat=5):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return 1e6*min(times)
+
+
+def main():
+    win = GraphWin("polygons", 1200, 700)
+    win.setCoords(0, 0, 100, 100)
+    trans = win.trans
+    print("{:>8} {:>14} {:>14} {:>14} {:>14}".format(
+        "vertices", "toScreen us", "python us", "numpy us", "draw us"))
+    for vertices in (10, 100, 1000, 10000):
+        points = star(vertices)
+        coords = [v for p in points for v in (p.x, p.y)]
+        def oneByOne():
+            return [v for p in points for v in win.toScreen(p.x, p.y)]
+        def python():
+            trans.manyThreshold = len(coords) + 1
+            try:
+                return win.toScreenMany(coords)
+            finally:
+                trans.manyThreshold = Transform.manyThreshold
+        def numpy():
+            trans.manyThreshold = 0
+            try:
+                return win.toScreenMany(coords)
+            finally:
+                trans.manyThreshold = Transform.manyThreshold
+        polygon = Polygon(points)
+        def draw():
+            polygon.draw(win)
+            polygon.undraw()
+        row = [best(oneByOne), best(python)]
+        row.append(best(numpy) if graphics._numpy() else float("nan"))
+        row.append(best(draw))
+        print("{:8} {:14.1f} {:14.1f} {:14.1f} {:14.1f}".format(vertices, *row))
+    win.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Check risksim against a one-game-at-a-time reference.
+
+Plays games one at a time in plain Python, following the rules risksim
+documents (AI.ml's choices, with lists in board order), rolling real dice
+instead of risksim's outcome tables. Then plays many more games with
+risksim and compares, for each lineup, the share of games each player won
+and the mean number of turns. Those barely move with some of the AI's
+choices, so the positions of the first --recorded reference games are also
+loaded into risksim, which must reinforce the same country in every one.
+Exits with status 1 if a choice differs or a result differs by more than
+--tolerance standard errors.
+
+    python3 benchmarks/sim_reference.py [--games N] [--sim-games N]
+                                        [--recorded N] [--seed S]
+                                        [--tolerance 4]
+
+make simcheck runs it.
+"""
+
+import argparse, math, os, random, sys, time
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import risksim
+from riskboard import continents, borders
+
+names = risksim.names
+N = len(names)
+neighbours = [[risksim.index[other] for other in borders[name]] for name in names]
+edges = [(a, b) for a in range(N) for b in neighbours[a]]
+continentCountries = [[risksim.index[c] for c in countries]
+                      for name, bonus, countries in continents]
+continentBonus = [bonus for name, bonus, countries in continents]
+
+lineups = [[1.5, 1.5], [1.1, 1.9], [1.2, 1.5, 1.8], [1.5, 1.5, 1.5, 1.5]]
+
+
+class Game:
+
+    """One game between AIs with the given ratios"""
+
+    def __init__(self, ratios, rng, record=False):
+        self.ratios = ratios
+        self.players = len(ratios)
+        self.rng = rng
+        self.owner = [-1]*N
+        self.troops = [0]*N
+        self.cards = [[0, 0, 0] for p in ratios]
+        self.undeployed = 0
+        self.reward = 5
+        self.turn = 0
+        self.turns = 0
+        self.winner = None
+        # (player, owner, troops, country reinforced) for every troop placed
+        self.placements = [] if record else None
+
+    def held(self, player):
+        return [i for i in range(N) if self.owner[i] == player]
+
+    def enemyTroops(self, country):
+        return sum(self.troops[j] for j in neighbours[country]
+                   if self.owner[j] != self.owner[country])
+
+    def reinforceTarget(self):
+        # ai_next_reinforce and country_to_reinforce
+        needs = [(i, self.enemyTroops(i) - self.troops[i]) for i in self.held(self.turn)
+                 if self.enemyTroops(i) > 0]
+        first = needs[0]
+        for country, need in needs:
+            if need > first[1]:
+                return country
+        return first[0]
+
+    def place(self, count):
+        for i in range(count):
+            target = self.reinforceTarget()
+            if self.placements is not None:
+                self.placements.append((self.turn, list(self.owner), list(self.troops), target))
+            self.troops[target] += 1
+
+    def setup(self):
+        for i in range(N):
+            # ai_next_initial_reinforce
+            empty = [c for c in continentCountries
+                     if all(self.owner[j] < 0 for j in c)]
+            if empty:
+                country = self.rng.choice(self.rng.choice(empty))
+            else:
+                country = self.rng.choice([j for j in range(N) if self.owner[j] < 0])
+            self.owner[country] = i % self.players
+            self.troops[country] = 1
+        for i in range(risksim.startingTroops[self.players] - N//self.players):
+            for player in range(self.players):
+                self.turn = player
+                self.place(1)
+            self.turns = self.turns + 1
+        self.turn = 0
+
+    def roll(self, attackers, defenders):
+        attack = sorted((self.rng.randint(1, 6) for i in range(min(attackers - 1, 3))),
+                        reverse=True)
+        defend = sorted((self.rng.randint(1, 6) for i in range(min(defenders, 2))),
+                        reverse=True)
+        lost = [0, 0]
+        for a, d in zip(attack, defend):
+            if a > d:
+                lost[1] += 1
+            else:
+                lost[0] += 1 # ties go to the defender
+        return lost
+
+    def attack(self):
+        # ai_next_attack: the first border where we outnumber them enough.
+        # Returns False when the AI stops or the game is won.
+        p = self.turn
+        for a, d in edges:
+            if (self.owner[a] == p and self.owner[d] != p and self.troops[a] >= 2 and
+                    self.troops[a] > self.ratios[p]*self.troops[d]):
+                break
+        else:
+            return False
+        lostA, lostD = self.roll(self.troops[a], self.troops[d])
+        self.troops[a] -= lostA
+        self.troops[d] -= lostD
+        if self.troops[d] == 0:
+            self.owner[d] = p
+            moving = self.troops[a] - 2
+            self.troops[a] = self.troops[d] = 1
+            if len(self.held(p)) == N:
+                self.winner = p
+                return False
+            for i in range(moving):
+                # ai_next_reinforce_after_attack
+                borderA, borderD = self.enemyTroops(a), self.enemyTroops(d)
+                if borderA == 0:
+                    target = d
+                elif borderD == 0:
+                    target = a
+                elif borderA - self.troops[a] > borderD - self.troops[d]:
+                    target = a
+                else:
+                    target = d
+                self.troops[target] += 1
+        return True
+
+    def playTurn(self):
+        p = self.turn
+        cards = self.cards[p]
+        same = [shape for shape in range(3) if cards[shape] >= 3]
+        if same or all(cards):
+            if same:
+                cards[same[0]] -= 3
+            else:
+                cards[:] = [n - 1 for n in cards]
+            self.undeployed = self.undeployed + self.reward
+            self.reward = self.reward + 5
+        held = self.held(p)
+        bonus = sum(b for c, b in zip(continentCountries, continentBonus)
+                    if all(self.owner[j] == p for j in c))
+        self.place(self.undeployed + max(3, len(held)//3) + bonus)
+        self.undeployed = 0
+        while self.attack():
+            pass
+        if self.winner is not None:
+            return
+        if len(self.held(p)) > len(held):
+            cards[self.rng.randrange(3)] += 1
+        # ai_next_fortify: the interior country with the most troops
+        interior = [i for i in self.held(p) if self.enemyTroops(i) == 0]
+        source = max(interior, key=lambda i: (self.troops[i], -i)) if interior else None
+        if source is not None and self.troops[source] > 1:
+            moving = self.troops[source] - 1
+            self.troops[source] = 1
+            self.place(moving)
+        for step in range(1, self.players + 1):
+            following = (p + step) % self.players
+            if self.held(following):
+                break
+        if following <= p:
+            self.turns = self.turns + 1
+        self.turn = following
+
+    def play(self):
+        self.setup()
+        while self.winner is None:
+            if self.turns >= risksim.maxTurns:
+                counts = [len(self.held(p)) for p in range(self.players)]
+                self.winner = counts.index(max(counts))
+            else:
+                self.playTurn()
+        return self
+
+
+def sameReinforcements(ratios, played):
+    # load every recorded position into risksim and compare its choices
+    placements = [p for game in played if game.placements for p in game.placements]
+    sim = risksim.Games(len(placements), ratios)
+    sim.turn[:] = [p[0] for p in placements]
+    sim.owner[:] = [p[1] for p in placements]
+    sim.troops[:] = [p[2] for p in placements]
+    g = numpy.arange(len(placements))
+    chosen = sim._reinforceTarget(g, sim._own(g))
+    same = int((chosen == numpy.array([p[3] for p in placements])).sum())
+    print("  reinforcing   {} of {} placements alike  {}".format(
+        same, len(placements), same == len(placements) and "ok" or "DIFFERENT"))
+    return same == len(placements)
+
+
+def compare(ratios, games, simGames, seed, tolerance, recorded):
+    rng = random.Random(seed)
+    start = time.time()
+    played = [Game(ratios, rng, i < recorded).play() for i in range(games)]
+    seconds = time.time() - start
+    sim = risksim.play(simGames, ratios, seed)
+    print("ratios {}: {} reference games ({:.1f} s), {} risksim games".format(
+        " ".join("{:.2f}".format(r) for r in ratios), games, seconds, simGames))
+    ok = sameReinforcements(ratios, played)
+    simWins = sim.wins()/float(simGames)
+    for p in range(len(ratios)):
+        ref = sum(g.winner == p for g in played)/float(games)
+        error = math.sqrt(max(ref*(1 - ref), 1e-4)/games + simWins[p]*(1 - simWins[p])/simGames)
+        agree = abs(ref - simWins[p]) <= tolerance*error
+        ok = ok and agree
+        print("  player {} won   {:6.1%} vs {:6.1%}  {}".format(
+            p + 1, ref, simWins[p], agree and "ok" or "DIFFERENT"))
+    turns = [g.turns for g in played]
+    mean = sum(turns)/float(games)
+    spread = math.sqrt(sum((t - mean)**2 for t in turns)/max(1, games - 1))
+    error = math.sqrt(spread**2/games + sim.turns.var()/simGames)
+    agree = abs(mean - sim.turns.mean()) <= tolerance*max(error, 1e-9)
+    print("  mean turns    {:6.2f}  vs {:6.2f}   {}".format(
+        mean, sim.turns.mean(), agree and "ok" or "DIFFERENT"))
+    return ok and agree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check risksim against a reference")
+    parser.add_argument("--games", type=int, default=2000, help="reference games per lineup")
+    parser.add_argument("--sim-games", type=int, default=20000, help="risksim games per lineup")
+    parser.add_argument("--seed", type=int, default=3110)
+    parser.add_argument("--recorded", type=int, default=100,
+                        help="reference games whose positions are replayed")
+    parser.add_argument("--tolerance", type=float, default=4.0,
+                        help="standard errors allowed")
+    args = parser.parse_args()
+    ok = True
+    for ratios in lineups:
+        ok = compare(ratios, args.games, args.sim_games, args.seed, args.tolerance,
+                     args.recorded) and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Benchmark suite for the graphics and riskgraphics hot paths.
+
+Times repeatable workloads (fixed seeds) in one interpreter and writes the
+results as JSON:
+
+    drawBoard         a fresh board, static layers cached
+    clicker           answering a burst of queued clicks on countries
+    updates           a mixed game-like run of updateBoard, updateAttack
+                      and updateBoardNoClick calls, drained by flush()
+    updateDice        random attack/defend rolls
+    endgame           the end screen with end.PPM not loaded yet
+
+    python3 benchmarks/suite.py [--repeat N] [--seed S] [--only NAME]
+                                [--out results.json] [--compare baseline.json]
+                                [--threshold 0.1]
+
+make bench runs it headless.
+
+Set GRAPHICS_BACKEND=headless to run without a display, or run under
+xvfb-run to measure Tk. With --compare, each median is shown next to the
+baseline's and the exit status is 1 if any benchmark got slower by more
+than the threshold (a fraction, 10% by default).
+"""
+
+import argparse, json, os, platform, random, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from importlib import reload
+except ImportError:
+    pass # Python 2 builtin
+import graphics
+from graphics import InputEvent, Point
+import assets
+import riskgraphics
+
+players = ["Player one", "Player two", "Player three", "Player four"]
+
+
+def freshBoard():
+    # drawBoard on a freshly loaded riskgraphics, as at the start of a game
+    global riskgraphics
+    riskgraphics = reload(riskgraphics)
+    return riskgraphics.drawBoard()
+
+
+def countryCenter(name):
+    rect = riskgraphics.countriesDict[name][0]
+    p, q = rect.getP1(), rect.getP2()
+    return Point((p.x + q.x)/2.0, (p.y + q.y)/2.0)
+
+
+def randomState(rng, names):
+    occupied = [(name, rng.choice(players), rng.randint(1, 30)) for name in names]
+    cards = [(player, rng.randint(0, 5)) for player in players]
+    return occupied, cards
+
+
+# Each benchmark takes (rng, win) and returns a function to time; setup
+# done before that function is returned is not timed
+
+def benchDrawBoard(rng, win):
+    win.close()
+    def run():
+        return freshBoard()
+    return run
+
+
+def benchClicker(rng, win, clicks=200):
+    names = sorted(riskgraphics.countriesDict)
+    points = [countryCenter(rng.choice(names)) for i in range(clicks)]
+    def run():
+        for p in points:
+            win._queueEvent(InputEvent("click", p))
+        for p in points:
+            riskgraphics.clicker(win)
+    return run
+
+
+def benchUpdates(rng, win, calls=300):
+    names = sorted(riskgraphics.countriesDict)
+    script = []
+    for i in range(calls):
+        occupied, cards = randomState(rng, names)
+        country = rng.choice(occupied)
+        player = rng.choice(players)
+        kind = rng.choice(["updateBoard", "updateAttack", "updateBoardNoClick"])
+        note = "turn {}".format(i)
+        if kind == "updateBoard":
+            args = [win, (country[0], True), country, cards, 5, i, None, player, note]
+        elif kind == "updateAttack":
+            other = rng.choice(occupied)
+            args = [win, (country[0], True), country, other, cards, 5, i, None,
+                    player, note]
+        else:
+            args = [win, country, cards, 5, i, None, player, note]
+        script.append((kind, args))
+    def run():
+        for kind, args in script:
+            riskgraphics.post(kind, args)
+        riskgraphics.flush()
+    return run
+
+
+def benchUpdateDice(rng, win, rolls=300):
+    script = []
+    for i in range(rolls):
+        attack = sorted((rng.randint(1, 6) for j in range(rng.randint(1, 3))), reverse=True)
+        defend = sorted((rng.randint(1, 6) for j in range(rng.randint(1, 2))), reverse=True)
+        script.append((attack, defend))
+    def run():
+        for attack, defend in script:
+            riskgraphics.updateDice(attack, defend, win)
+        win.flush()
+    return run
+
+
+def benchEndgame(rng, win):
+    for cache in (assets._data, assets._ready, assets._errors, assets._images):
+        cache.clear()
+    def run():
+        win.feedClick(50, 50)
+        riskgraphics.endgame(win, rng.choice(players))
+    return run
+
+
+benchmarks = [("drawBoard", benchDrawBoard), ("clicker", benchClicker),
+              ("updates", benchUpdates), ("updateDice", benchUpdateDice),
+              ("endgame", benchEndgame)]
+
+
+def measure(bench, seed, repeat):
+    # Every run gets the same workload. The first run warms up imports and
+    # caches and is not counted.
+    times = []
+    for i in range(repeat + 1):
+        win = freshBoard()
+        run = bench(random.Random(seed), win)
+        start = time.perf_counter()
+        result = run()
+        if i:
+            times.append(time.perf_counter() - start)
+        for w in (win, result):
+            if isinstance(w, graphics.GraphWin) and not w.isClosed():
+                w.close()
+    times.sort()
+    return {"runs": repeat, "medianMs": 1000*times[len(times)//2],
+            "minMs": 1000*times[0], "maxMs": 1000*times[-1]}
+
+
+def compare(results, baseline, threshold):
+    # Print each median against the baseline; return the names that got
+    # slower by more than threshold
+    slower = []
+    print("{:12} {:>12} {:>12} {:>8}".format("benchmark", "baseline ms", "now ms", "change"))
+    for name, stats in results["results"].items():
+        if name not in baseline["results"]:
+            print("{:12} {:>12} {:12.2f}".format(name, "-", stats["medianMs"]))
+            continue
+        before = baseline["results"][name]["medianMs"]
+        change = (stats["medianMs"] - before)/before if before else 0.0
+        flag = ""
+        if change > threshold:
+            slower.append(name)
+            flag = "  SLOWER"
+        print("{:12} {:12.2f} {:12.2f} {:+7.1%}{}".format(
+            name, before, stats["medianMs"], change, flag))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="graphics/riskgraphics benchmarks")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=3110)
+    parser.add_argument("--only", action="append", help="run just this benchmark")
+    parser.add_argument("--out", help="write the results here as JSON")
+    parser.add_argument("--compare", help="baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = {"meta": {"python": platform.python_version(),
+                        "backend": "headless" if graphics._headless else "tk",
+                        "frameRate": riskgraphics.frameRate,
+                        "seed": args.seed, "repeat": args.repeat},
+               "results": {}}
+    for name, bench in benchmarks:
+        if args.only and name not in args.only:
+            continue
+        stats = measure(bench, args.seed, args.repeat)
+        results["results"][name] = stats
+        print("{:12} median {medianMs:9.2f} ms  min {minMs:9.2f} ms".format(name, **stats))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print("")
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -62,6 +62,39 @@ http://mcsp.wartburg.edu/zelle/python for a quick reference"""
 
 __version__ = "5.0"
 
+# Big Red R!sk changes
+#     * getMouse and getKey block on Tk variables written by the event
+#       handlers instead of polling update() every 100 ms
+#     * GraphWin.batch()/beginBatch()/commitBatch() defer autoflush and
+#       flush once at the end
+#     * _reconfig only sends the changed option, and skips it entirely when
+#       the drawn item already has that value; GraphWin.getOpStats() counts
+#       issued vs. skipped canvas operations
+#     * Image can share another Image's picture, setImage swaps the picture
+#       of a drawn Image, setVisible hides/shows items via the Tk state option
+#     * GraphWin.items is an OrderedDict keyed by id(item), so addItem and
+#       delItem are O(1)
+#     * HeadlessGraphWin: same API on an in-memory scene with scripted
+#       input, chosen with GraphWin(..., headless=True) or
+#       GRAPHICS_BACKEND=headless (which also keeps Tk from starting)
+#     * feedClick/feedKey script input on Tk windows too: it is delivered
+#       when the window next waits for input
+#     * Layer: static drawings compiled once to tagged canvas items
+#     * Tk root is created on first use instead of on import, and Image
+#       decodes its file on first use
+#     * Photos can be made from PPM data already in memory, and
+#       Layer.imageFiles lists the files a Layer needs
+#     * Image.getPixels/setPixels move a whole rectangle of pixels as one
+#       buffer in a single Tk call
+#     * RenderScheduler coalesces option changes and redraws a GraphWin at
+#       most once per frame
+#     * Clicks and keys go into a bounded queue of timestamped InputEvents
+#       (GraphWin.events) instead of one slot each, read with nextEvent
+#       and drainEvents as well as getMouse/getKey
+#     * Transform.screenMany/GraphWin.toScreenMany convert a flat list of
+#       coordinates at once (with NumPy, if installed, for long ones);
+#       Polygon, Line, Rectangle and Oval draw through them
+
 # Version 5 8/26/2016
 #     * update at bottom to fix MacOS issue causing askopenfile() to hang
 #     * update takes an optional parameter specifying update rate
@@ -160,13 +193,37 @@ __version__ = "5.0"
 #     Added ability to set text atttributes.
 #     Added Entry boxes.
 
-import time, os, sys
+import time, os, sys, heapq
 from itertools import cycle
-
-try:  # import as appropriate for 2.x vs. 3.x
-   import tkinter as tk
-except:
-   import Tkinter as tk
+from contextlib import contextmanager
+from collections import OrderedDict, deque
+
+# GRAPHICS_BACKEND=headless makes every GraphWin a HeadlessGraphWin and
+# keeps tkinter from even being imported
+_headless = os.environ.get("GRAPHICS_BACKEND", "").lower() == "headless"
+
+tk = None
+if not _headless:
+   try:  # import as appropriate for 2.x vs. 3.x
+      import tkinter as tk
+   except:
+      try:
+         import Tkinter as tk
+      except:
+         _headless = True # only the headless backend is available
+
+# NumPy is optional. It is only imported the first time it is worth it.
+_numpyModule = False # not tried yet
+
+def _numpy():
+    global _numpyModule
+    if _numpyModule is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpyModule = numpy
+    return _numpyModule
 
 
 ##########################################################################
@@ -183,8 +240,22 @@ BAD_OPTION = "Illegal option value"
 ##########################################################################
 # global variables and funtions
 
-_root = tk.Tk()
-_root.withdraw()
+# The Tk root is made by _tkRoot on first use, so importing graphics does
+# not start Tk
+_root = None
+
+def _tkRoot():
+    global _root
+    if _root == None:
+        if tk == None:
+            raise GraphicsError("Tk backend is not available")
+        _root = tk.Tk()
+        _root.withdraw()
+    return _root
+
+def _updateRoot():
+    # Every flush of the Tk event loop goes through here
+    _root.update()
 
 _update_lasttime = time.time()
 
@@ -199,40 +270,72 @@ def update(rate=None):
         else:
             _update_lasttime = now
 
-    _root.update()
+    if _root:
+        _updateRoot()
 
 ############################################################################
 # Graphics classes start here
 
-class GraphWin(tk.Canvas):
+if tk:
+    _Canvas = tk.Canvas
+else:
+    _Canvas = object
+
+class GraphWin(_Canvas):
 
     """A GraphWin is a toplevel window for displaying graphics."""
 
+    headless = False
+    eventLimit = 256 # clicks and keys kept until they are read
+
+    def __new__(cls, *args, **kwargs):
+        # GraphWin(..., headless=True), or GRAPHICS_BACKEND=headless, gives
+        # a HeadlessGraphWin
+        headless = kwargs.get("headless")
+        if headless == None:
+            headless = _headless
+        if cls is GraphWin and headless:
+            cls = HeadlessGraphWin
+        return object.__new__(cls)
+
     def __init__(self, title="Graphics Window",
-                 width=200, height=200, autoflush=True):
+                 width=200, height=200, autoflush=True, headless=None):
         assert type(title) == type(""), "Title must be a string"
-        master = tk.Toplevel(_root)
+        root = _tkRoot() # before tk is used: it is None without Tk
+        master = tk.Toplevel(root)
         master.protocol("WM_DELETE_WINDOW", self.close)
         tk.Canvas.__init__(self, master, width=width, height=height,
                            highlightthickness=0, bd=0)
         self.master.title(title)
         self.pack()
         master.resizable(0,0)
-        self.foreground = "black"
-        self.items = []
-        self.mouseX = None
-        self.mouseY = None
+        self._initState(width, height, autoflush)
+        # Written when an event is queued (and on close) to wake anyone
+        # waiting for input
+        self._inputEvent = tk.IntVar(_root)
         self.bind("<Button-1>", self._onClick)
         self.bind_all("<Key>", self._onKey)
+        master.lift()
+        if autoflush: _updateRoot()
+
+    def _initState(self, width, height, autoflush):
+        # state shared by the Tk and headless windows
+        self.foreground = "black"
+        self.items = OrderedDict() # id(item) -> item, in draw order
+        self.events = deque(maxlen=self.eventLimit) # InputEvents, oldest first
+        self.eventsDropped = 0 # events pushed out of a full queue
         self.height = int(height)
         self.width = int(width)
         self.autoflush = autoflush
+        self._batchDepth = 0
+        self._batchAutoflush = autoflush
+        self.opsIssued = 0   # canvas operations sent to Tk
+        self.opsSkipped = 0  # reconfigs dropped because nothing changed
+        self.scheduler = None # RenderScheduler pacing the flushes, if any
         self._mouseCallback = None
         self.trans = None
         self.closed = False
-        master.lift()
-        self.lastKey = ""
-        if autoflush: _root.update()
+        self._script = deque() # scripted InputEvents not yet delivered
 
     def __repr__(self):
         if self.isClosed():
@@ -250,14 +353,14 @@ class GraphWin(tk.Canvas):
             raise GraphicsError("window is closed")
 
     def _onKey(self, evnt):
-        self.lastKey = evnt.keysym
+        self._queueEvent(InputEvent("key", key=evnt.keysym))
 
 
     def setBackground(self, color):
         """Set background color of the window"""
         self.__checkOpen()
         self.config(bg=color)
-        self.__autoflush()
+        self._autoflush()
 
     def setCoords(self, x1, y1, x2, y2):
         """Set coordinates of window to run from (x1,y1) in the
@@ -271,7 +374,9 @@ class GraphWin(tk.Canvas):
         if self.closed: return
         self.closed = True
         self.master.destroy()
-        self.__autoflush()
+        # wake up anyone blocked in getMouse/getKey/nextEvent
+        self._wake()
+        self._autoflush()
 
 
     def isClosed(self):
@@ -282,9 +387,17 @@ class GraphWin(tk.Canvas):
         return not self.closed
 
 
-    def __autoflush(self):
-        if self.autoflush:
-            _root.update()
+    def _autoflush(self):
+        if self.scheduler:
+            self.scheduler.request()
+        elif self.autoflush:
+            _updateRoot()
+
+    def _commitFrame(self):
+        # Show changes a RenderScheduler is holding back before waiting
+        # for the user
+        if self.scheduler:
+            self.scheduler.commit()
 
 
     def plot(self, x, y, color="black"):
@@ -292,69 +405,210 @@ class GraphWin(tk.Canvas):
         self.__checkOpen()
         xs,ys = self.toScreen(x,y)
         self.create_line(xs,ys,xs+1,ys, fill=color)
-        self.__autoflush()
+        self._autoflush()
 
     def plotPixel(self, x, y, color="black"):
         """Set pixel raw (independent of window coordinates) pixel
         (x,y) to color"""
         self.__checkOpen()
         self.create_line(x,y,x+1,y, fill=color)
-        self.__autoflush()
+        self._autoflush()
 
     def flush(self):
         """Update drawing to the window"""
         self.__checkOpen()
+        self._commitFrame()
         self.update_idletasks()
 
+    def beginBatch(self):
+        """Start deferring flushes. Drawing calls made until the matching
+        commitBatch do not update the window. Batches may be nested."""
+        if self._batchDepth == 0:
+            self._batchAutoflush = self.autoflush
+            self.autoflush = False
+        self._batchDepth = self._batchDepth + 1
+
+    def commitBatch(self):
+        """End a batch started by beginBatch. Ending the outermost batch
+        restores autoflush and, if it was on, updates the window once
+        (commits the frame, with a RenderScheduler)."""
+        if self._batchDepth == 0:
+            raise GraphicsError("commitBatch without beginBatch")
+        self._batchDepth = self._batchDepth - 1
+        if self._batchDepth == 0:
+            self.autoflush = self._batchAutoflush
+            if self.scheduler:
+                self.scheduler.commit()
+            elif self.autoflush and not self.closed:
+                self.update_idletasks()
+
+    def getOpStats(self):
+        """Return a dict with the number of canvas operations issued to Tk
+        and the number skipped because the item already had that value"""
+        return {"issued": self.opsIssued, "skipped": self.opsSkipped}
+
+    def resetOpStats(self):
+        self.opsIssued = 0
+        self.opsSkipped = 0
+
+    @contextmanager
+    def batch(self):
+        """Context manager form of beginBatch/commitBatch:
+
+            with win.batch():
+                ...many draws and setFills...
+        """
+        self.beginBatch()
+        try:
+            yield self
+        finally:
+            self.commitBatch()
+
     def getMouse(self):
         """Wait for mouse click and return Point object representing
         the click"""
+        self._commitFrame()
         self.update()      # flush any prior clicks
-        self.mouseX = None
-        self.mouseY = None
-        while self.mouseX == None or self.mouseY == None:
-            self.update()
-            if self.isClosed(): raise GraphicsError("getMouse in closed window")
-            time.sleep(.1) # give up thread
-        x,y = self.toWorld(self.mouseX, self.mouseY)
-        self.mouseX = None
-        self.mouseY = None
-        return Point(x,y)
+        self._dropEvents("click")
+        return self._nextEvent("click", None, "getMouse").point
 
     def checkMouse(self):
         """Return last mouse click or None if mouse has
         not been clicked since last call"""
         if self.isClosed():
             raise GraphicsError("checkMouse in closed window")
-        self.update()
-        if self.mouseX != None and self.mouseY != None:
-            x,y = self.toWorld(self.mouseX, self.mouseY)
-            self.mouseX = None
-            self.mouseY = None
-            return Point(x,y)
+        self._pollInput("click")
+        clicks = [event for event in self.events if event.kind == "click"]
+        self._dropEvents("click")
+        if clicks:
+            return clicks[-1].point
         else:
             return None
 
     def getKey(self):
         """Wait for user to press a key and return it as a string."""
-        self.lastKey = ""
-        while self.lastKey == "":
-            self.update()
-            if self.isClosed(): raise GraphicsError("getKey in closed window")
-            time.sleep(.1) # give up thread
-
-        key = self.lastKey
-        self.lastKey = ""
-        return key
+        self._commitFrame()
+        self._dropEvents("key")
+        return self._nextEvent("key", None, "getKey").key
 
     def checkKey(self):
         """Return last key pressed or None if no key pressed since last call"""
         if self.isClosed():
             raise GraphicsError("checkKey in closed window")
+        self._pollInput("key")
+        keys = [event for event in self.events if event.kind == "key"]
+        self._dropEvents("key")
+        if keys:
+            return keys[-1].key
+        else:
+            return ""
+
+    def nextEvent(self, timeout=None):
+        """Remove and return the oldest queued InputEvent (click or key),
+        waiting up to timeout seconds for one (forever if timeout is None).
+        Returns None if the time runs out."""
+        self._commitFrame()
+        if not self.events and not self.isClosed():
+            self._pollInput(None)
+        return self._nextEvent(None, timeout, "nextEvent")
+
+    def drainEvents(self):
+        """Remove and return every queued InputEvent, oldest first"""
+        if not self.isClosed():
+            self._pollInput(None)
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    # Scripted input
+
+    def feedClick(self, x, y):
+        """Queue a click at world point (x,y) to be delivered the next time
+        the window waits for input, as if the user clicked then"""
+        self._script.append(InputEvent("click", Point(x,y)))
+
+    def feedClicks(self, points):
+        """Queue clicks given as Points or (x,y) pairs"""
+        for p in points:
+            if isinstance(p, Point):
+                self.feedClick(p.x, p.y)
+            else:
+                self.feedClick(p[0], p[1])
+
+    def feedKey(self, key):
+        """Queue a key (a keysym string) for getKey/checkKey"""
+        self._script.append(InputEvent("key", key=key))
+
+    def feedKeys(self, keys):
+        for key in keys:
+            self.feedKey(key)
+
+    def _deliver(self):
+        # The user "does" the next scripted thing
+        event = self._script.popleft()
+        event.time = time.time()
+        self._queueEvent(event)
+
+    def _queueEvent(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.eventsDropped = self.eventsDropped + 1
+        self.events.append(event)
+        self._wake()
+
+    def _takeEvent(self, kind):
+        # Remove and return the oldest queued event of kind (any if None)
+        for event in self.events:
+            if kind == None or event.kind == kind:
+                self.events.remove(event)
+                return event
+        return None
+
+    def _dropEvents(self, kind):
+        kept = [event for event in self.events if event.kind != kind]
+        if len(kept) != len(self.events):
+            self.events.clear()
+            self.events.extend(kept)
+
+    def _nextEvent(self, kind, timeout, caller):
+        # Wait for an event of kind, or until timeout seconds have passed
+        deadline = None
+        if timeout != None:
+            deadline = time.time() + timeout
+        while True:
+            event = self._takeEvent(kind)
+            if event != None:
+                return event
+            if self.isClosed(): raise GraphicsError(caller + " in closed window")
+            left = None
+            if deadline != None:
+                left = deadline - time.time()
+                if left <= 0:
+                    return None
+            if not self._waitInput(left):
+                if deadline != None:
+                    return None
+                raise GraphicsError(caller + " in headless window with no input left")
+
+    def _pollInput(self, kind):
+        # Queue the events Tk has received without waiting for more
         self.update()
-        key = self.lastKey
-        self.lastKey = ""
-        return key
+
+    def _waitInput(self, timeout):
+        # Run the event loop until an event is queued, the window closes
+        # or timeout seconds pass. Scripted input comes first.
+        if self._script:
+            self._deliver()
+            return True
+        timer = None
+        if timeout != None:
+            timer = self.after(max(1, int(timeout*1000)), self._wake)
+        self.wait_variable(self._inputEvent)
+        if timer != None:
+            self.after_cancel(timer)
+        return True
+
+    def _wake(self):
+        self._inputEvent.set(1)
 
     def getHeight(self):
         """Return the height of the window"""
@@ -371,6 +625,15 @@ class GraphWin(tk.Canvas):
         else:
             return x,y
 
+    def toScreenMany(self, coords):
+        """toScreen for a flat sequence of coordinates x0,y0,x1,y1,...,
+        returned as a flat list"""
+        trans = self.trans
+        if trans:
+            return trans.screenMany(coords)
+        else:
+            return list(coords)
+
     def toWorld(self, x, y):
         trans = self.trans
         if trans:
@@ -382,24 +645,424 @@ class GraphWin(tk.Canvas):
         self._mouseCallback = func
 
     def _onClick(self, e):
-        self.mouseX = e.x
-        self.mouseY = e.y
+        x,y = self.toWorld(e.x, e.y)
+        self._queueEvent(InputEvent("click", Point(x,y)))
         if self._mouseCallback:
             self._mouseCallback(Point(e.x, e.y))
 
     def addItem(self, item):
-        self.items.append(item)
+        self.items[id(item)] = item
 
     def delItem(self, item):
-        self.items.remove(item)
+        del self.items[id(item)]
 
     def redraw(self):
-        for item in self.items[:]:
+        # each item goes to the back of items as it is redrawn, so the
+        # draw order is kept
+        for item in list(self.items.values()):
             item.undraw()
             item.draw(self)
         self.update()
 
 
+class InputEvent:
+
+    """A mouse click or key press queued by a GraphWin. kind is "click"
+    (point is where, in world coordinates) or "key" (key is the keysym),
+    and time is when it happened, from time.time()."""
+
+    __slots__ = ("kind", "point", "key", "time")
+
+    def __init__(self, kind, point=None, key=None):
+        self.kind = kind
+        self.point = point
+        self.key = key
+        self.time = time.time()
+
+    def __repr__(self):
+        if self.kind == "click":
+            return "InputEvent(click, {})".format(self.point)
+        return "InputEvent(key, '{}')".format(self.key)
+
+
+class _SceneItem:
+
+    """One item of a HeadlessGraphWin scene"""
+
+    __slots__ = ("kind", "coords", "options", "tags")
+
+    def __init__(self, kind, coords, options, tags):
+        self.kind = kind
+        self.coords = coords
+        self.options = options
+        self.tags = tags
+
+    def __repr__(self):
+        return "_SceneItem({}, {}, {})".format(self.kind, self.coords, self.options)
+
+
+class HeadlessGraphWin(GraphWin):
+
+    """A GraphWin with no Tk behind it. Drawing goes into an in-memory
+    scene that can be inspected with the usual canvas queries (find_all,
+    type, coords, itemcget, gettags) and getMouse/getKey are answered
+    from scripted input queued with feedClick/feedKey. Timers set with
+    after() run whenever the window waits for input, so nothing ever
+    sleeps.
+
+    Use GraphWin(..., headless=True), or set GRAPHICS_BACKEND=headless
+    to make every GraphWin headless and never start Tk."""
+
+    headless = True
+
+    def __init__(self, title="Graphics Window",
+                 width=200, height=200, autoflush=True, headless=True,
+                 clicks=(), keys=()):
+        assert type(title) == type(""), "Title must be a string"
+        self._initState(width, height, autoflush)
+        self._title = title
+        self.scene = OrderedDict() # canvas id -> _SceneItem, bottom to top
+        self.canvasOptions = {"width": width, "height": height}
+        self._nextId = 1
+        self._timers = []      # heap of (due, seq, afterId)
+        self._timerCalls = {}  # afterId -> (func, args)
+        self._timerSeq = 0
+        self.feedClicks(clicks)
+        self.feedKeys(keys)
+
+    def __repr__(self):
+        if self.isClosed():
+            return "<Closed GraphWin>"
+        else:
+            return "HeadlessGraphWin('{}', {}, {})".format(self._title,
+                                                     self.getWidth(),
+                                                     self.getHeight())
+
+    def close(self):
+        """Close the window"""
+        self.closed = True
+
+    def _autoflush(self):
+        if self.scheduler:
+            self.scheduler.request()
+        elif self.autoflush and self._timers:
+            self._runTimers(False)
+
+    def _pollInput(self, kind):
+        # Deliver scripted events up to the first one of kind, as if they
+        # had happened since the last check
+        self.update()
+        while self._script:
+            nextKind = self._script[0].kind
+            self._deliver()
+            if kind == None or nextKind == kind:
+                break
+
+    def _waitInput(self, timeout):
+        # Deliver the next scripted event, or run timers until one does.
+        # There is no real waiting, so timeout does not matter; returns
+        # False when there is nothing left that could give input.
+        if self._script:
+            self._deliver()
+            return True
+        return self._runTimers(True)
+
+    def _wake(self):
+        pass
+
+    # Event loop stand-ins
+
+    def update(self):
+        self._runTimers(False)
+
+    def update_idletasks(self):
+        pass
+
+    def after(self, ms, func=None, *args):
+        if func == None:
+            return None # no need to sleep without a screen
+        self._timerSeq = self._timerSeq + 1
+        afterId = "after#{}".format(self._timerSeq)
+        heapq.heappush(self._timers, (time.time() + ms/1000.0, self._timerSeq, afterId))
+        self._timerCalls[afterId] = (func, args)
+        return afterId
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, afterId):
+        self._timerCalls.pop(afterId, None)
+
+    def _runTimers(self, force):
+        # Run the timers that are due. With force, run the earliest timer
+        # even if it is not due yet. Returns True if anything ran.
+        ran = False
+        now = time.time()
+        while self._timers:
+            due, seq, afterId = self._timers[0]
+            if afterId not in self._timerCalls:
+                heapq.heappop(self._timers)
+                continue
+            if due > now and not (force and not ran):
+                break
+            heapq.heappop(self._timers)
+            func, args = self._timerCalls.pop(afterId)
+            func(*args)
+            ran = True
+        return ran
+
+    # Canvas stand-ins, following the tkinter.Canvas signatures
+
+    def _create(self, kind, args, kw):
+        args = list(args)
+        if args and isinstance(args[-1], dict):
+            options = dict(args.pop())
+        else:
+            options = {}
+        options.update(kw)
+        coords = []
+        for arg in args:
+            if isinstance(arg, (list, tuple)):
+                coords.extend(arg)
+            else:
+                coords.append(arg)
+        tags = options.pop("tags", ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        itemId = self._nextId
+        self._nextId = itemId + 1
+        self.scene[itemId] = _SceneItem(kind, coords, options, tuple(tags))
+        return itemId
+
+    def create_arc(self, *args, **kw):
+        return self._create("arc", args, kw)
+
+    def create_image(self, *args, **kw):
+        return self._create("image", args, kw)
+
+    def create_line(self, *args, **kw):
+        return self._create("line", args, kw)
+
+    def create_oval(self, *args, **kw):
+        return self._create("oval", args, kw)
+
+    def create_polygon(self, *args, **kw):
+        return self._create("polygon", args, kw)
+
+    def create_rectangle(self, *args, **kw):
+        return self._create("rectangle", args, kw)
+
+    def create_text(self, *args, **kw):
+        return self._create("text", args, kw)
+
+    def create_window(self, *args, **kw):
+        return self._create("window", args, kw)
+
+    def _find(self, tagOrId):
+        if tagOrId == "all":
+            return list(self.scene)
+        if isinstance(tagOrId, int):
+            if tagOrId in self.scene:
+                return [tagOrId]
+            return []
+        return [i for i in self.scene if tagOrId in self.scene[i].tags]
+
+    def find_all(self):
+        return tuple(self.scene)
+
+    def find_withtag(self, tagOrId):
+        return tuple(self._find(tagOrId))
+
+    def type(self, tagOrId):
+        for i in self._find(tagOrId):
+            return self.scene[i].kind
+        return None
+
+    def gettags(self, tagOrId):
+        for i in self._find(tagOrId):
+            return self.scene[i].tags
+        return ()
+
+    def coords(self, tagOrId, *args):
+        found = self._find(tagOrId)
+        if args:
+            coords = []
+            for arg in args:
+                if isinstance(arg, (list, tuple)):
+                    coords.extend(arg)
+                else:
+                    coords.append(arg)
+            for i in found:
+                self.scene[i].coords = list(coords)
+            return None
+        if found:
+            return list(self.scene[found[0]].coords)
+        return []
+
+    def itemconfig(self, tagOrId, cnf=None, **kw):
+        options = {}
+        if cnf:
+            options.update(cnf)
+        options.update(kw)
+        tags = options.pop("tags", None)
+        for i in self._find(tagOrId):
+            item = self.scene[i]
+            item.options.update(options)
+            if tags != None:
+                if isinstance(tags, str):
+                    tags = (tags,)
+                item.tags = tuple(tags)
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, tagOrId, option):
+        for i in self._find(tagOrId):
+            if option == "tags":
+                return self.scene[i].tags
+            return self.scene[i].options.get(option, "")
+        return ""
+
+    def move(self, tagOrId, dx, dy):
+        for i in self._find(tagOrId):
+            coords = self.scene[i].coords
+            for j in range(0, len(coords) - 1, 2):
+                coords[j] = coords[j] + dx
+                coords[j+1] = coords[j+1] + dy
+
+    def delete(self, *tagsOrIds):
+        for tagOrId in tagsOrIds:
+            for i in self._find(tagOrId):
+                del self.scene[i]
+
+    def tag_raise(self, tagOrId, aboveThis=None):
+        for i in self._find(tagOrId):
+            self.scene.move_to_end(i)
+
+    def tag_lower(self, tagOrId, belowThis=None):
+        for i in reversed(self._find(tagOrId)):
+            self.scene.move_to_end(i, last=False)
+
+    def config(self, cnf=None, **kw):
+        if cnf:
+            self.canvasOptions.update(cnf)
+        self.canvasOptions.update(kw)
+
+    configure = config
+
+    def cget(self, key):
+        return self.canvasOptions.get(key, "")
+
+
+class RenderScheduler:
+
+    """Paces the updates of a GraphWin to at most fps frames a second.
+
+    While a scheduler is attached, option changes (fills, outlines, text,
+    ...) are held back and only the last value set for each item is sent
+    when the next frame is committed, and the window is redrawn once per
+    frame instead of once per change. A frame is committed right away if
+    a whole frame interval has passed since the last one, otherwise by an
+    after() timer, and always before the window waits for input and when
+    the outermost batch ends. A program that runs no Tk event loop between
+    calls, so that timers never fire, should make its changes in batches.
+
+        scheduler = RenderScheduler(win, 30)
+        ...
+        scheduler.detach()
+    """
+
+    def __init__(self, graphwin, fps=30):
+        if graphwin.scheduler:
+            graphwin.scheduler.detach()
+        self.win = graphwin
+        self.interval = 1.0/fps
+        self.pending = OrderedDict() # (id(obj), option) -> (obj, option, value)
+        self.dirty = False
+        self.dirtySince = 0
+        self.timer = None
+        self.lastCommit = 0
+        self.requests = 0
+        self.frames = 0
+        self.dropped = 0
+        self.frameTimes = deque(maxlen=1000)
+        graphwin.scheduler = self
+
+    def __repr__(self):
+        return "RenderScheduler({}, {})".format(self.win, int(round(1/self.interval)))
+
+    def detach(self):
+        """Commit what is pending and give the window back its own
+        flushing"""
+        self.commit()
+        if self.win.scheduler is self:
+            self.win.scheduler = None
+
+    def setOption(self, obj, option, value):
+        self.pending[(id(obj), option)] = (obj, option, value)
+
+    def request(self):
+        """Note that the window needs a new frame"""
+        self.requests = self.requests + 1
+        now = time.time()
+        if not self.dirty:
+            self.dirty = True
+            self.dirtySince = now
+        win = self.win
+        if win.isClosed():
+            return
+        wait = self.lastCommit + self.interval - now
+        if wait <= 0 and win._batchDepth == 0:
+            self.commit()
+        elif self.timer == None:
+            self.timer = win.after(max(1, int(wait*1000)), self._onTimer)
+
+    def _onTimer(self):
+        self.timer = None
+        if self.win._batchDepth == 0:
+            self.commit()
+        else:
+            self.request()
+
+    def commit(self):
+        """Send the pending changes and redraw the window now"""
+        win = self.win
+        if self.timer != None:
+            win.after_cancel(self.timer)
+            self.timer = None
+        if not self.dirty:
+            return
+        self.dirty = False
+        pending = self.pending
+        self.pending = OrderedDict()
+        if win.isClosed():
+            return
+        start = time.time()
+        # frames that were due while changes waited but never drawn
+        due = max(self.dirtySince, self.lastCommit + self.interval)
+        if start - due > self.interval:
+            self.dropped = self.dropped + int((start - due)/self.interval)
+        for obj, option, value in pending.values():
+            if obj.canvas is win:
+                win.itemconfig(obj.id, {option: value})
+                win.opsIssued = win.opsIssued + 1
+        win.update_idletasks()
+        self.lastCommit = time.time()
+        self.frames = self.frames + 1
+        self.frameTimes.append(self.lastCommit - start)
+
+    def getStats(self):
+        """Return a dict with the number of frames requested and committed,
+        the frames dropped, and the median and worst frame time (ms)"""
+        times = sorted(self.frameTimes)
+        if times:
+            median, worst = times[len(times)//2], times[-1]
+        else:
+            median, worst = 0, 0
+        return {"requests": self.requests, "frames": self.frames,
+                "dropped": self.dropped, "frameMs": 1000*median,
+                "worstFrameMs": 1000*worst}
+
+
 class Transform:
 
     """Internal class for 2-D coordinate transformations"""
@@ -421,6 +1084,31 @@ class Transform:
         ys = (self.ybase-y) / self.yscale
         return int(xs+0.5),int(ys+0.5)
 
+    # Coordinate lists at least this long go through NumPy when it is there
+    manyThreshold = 64
+
+    def screenMany(self, coords):
+        # Returns the flat sequence of world coordinates x0,y0,x1,y1,...
+        # (list, tuple, array.array or NumPy array) as a flat list of
+        # screen coordinates, rounded exactly as by screen()
+        n = len(coords)
+        if n % 2:
+            raise GraphicsError("coordinates must come in x,y pairs")
+        numpy = None
+        if n >= self.manyThreshold or not isinstance(coords, (list, tuple)):
+            numpy = _numpy()
+        if numpy != None:
+            world = numpy.asarray(coords, dtype=float).reshape(-1)
+            screen = numpy.empty(n, dtype=int) # assigning truncates, like int()
+            screen[0::2] = (world[0::2]-self.xbase) / self.xscale + 0.5
+            screen[1::2] = (self.ybase-world[1::2]) / self.yscale + 0.5
+            return screen.tolist()
+        xbase, ybase, xscale, yscale = self.xbase, self.ybase, self.xscale, self.yscale
+        screen = [0]*n
+        screen[0::2] = [int((x-xbase) / xscale + 0.5) for x in coords[0::2]]
+        screen[1::2] = [int((ybase-y) / yscale + 0.5) for y in coords[1::2]]
+        return screen
+
     def world(self,xs,ys):
         # Returns xs,ys in world coordinates
         x = xs*self.xscale + self.xbase
@@ -436,6 +1124,7 @@ DEFAULT_CONFIG = {"fill":"",
       "arrow":"none",
       "text":"",
       "justify":"center",
+      "state":"normal",
                   "font": ("helvetica", 12, "normal")}
 
 class GraphicsObject:
@@ -472,6 +1161,13 @@ class GraphicsObject:
         """Set line weight to width"""
         self._reconfig("width", width)
 
+    def setVisible(self, visible):
+        """Show or hide the drawn object without deleting it"""
+        if visible:
+            self._reconfig("state", "normal")
+        else:
+            self._reconfig("state", "hidden")
+
     def draw(self, graphwin):
 
         """Draw the object in graphwin, which should be a GraphWin
@@ -483,9 +1179,9 @@ class GraphicsObject:
         if graphwin.isClosed(): raise GraphicsError("Can't draw to closed window")
         self.canvas = graphwin
         self.id = self._draw(graphwin, self.config)
+        graphwin.opsIssued = graphwin.opsIssued + 1
         graphwin.addItem(self)
-        if graphwin.autoflush:
-            _root.update()
+        graphwin._autoflush()
         return self
 
 
@@ -497,9 +1193,9 @@ class GraphicsObject:
         if not self.canvas: return
         if not self.canvas.isClosed():
             self.canvas.delete(self.id)
+            self.canvas.opsIssued = self.canvas.opsIssued + 1
             self.canvas.delItem(self)
-            if self.canvas.autoflush:
-                _root.update()
+            self.canvas._autoflush()
         self.canvas = None
         self.id = None
 
@@ -509,8 +1205,12 @@ class GraphicsObject:
         """move object dx units in x direction and dy units in y
         direction"""
 
-        self._move(dx,dy)
         canvas = self.canvas
+        if dx == 0 and dy == 0:
+            if canvas and not canvas.isClosed():
+                canvas.opsSkipped = canvas.opsSkipped + 1
+            return
+        self._move(dx,dy)
         if canvas and not canvas.isClosed():
             trans = canvas.trans
             if trans:
@@ -520,21 +1220,33 @@ class GraphicsObject:
                 x = dx
                 y = dy
             self.canvas.move(self.id, x, y)
-            if canvas.autoflush:
-                _root.update()
+            canvas.opsIssued = canvas.opsIssued + 1
+            canvas._autoflush()
 
     def _reconfig(self, option, setting):
         # Internal method for changing configuration of the object
         # Raises an error if the option does not exist in the config
         #    dictionary for this object
+        # config always holds what the drawn item shows, so setting an
+        #    option to its current value is skipped without touching Tk
         if option not in self.config:
             raise GraphicsError(UNSUPPORTED_METHOD)
         options = self.config
-        options[option] = setting
-        if self.canvas and not self.canvas.isClosed():
-            self.canvas.itemconfig(self.id, options)
-            if self.canvas.autoflush:
-                _root.update()
+        canvas = self.canvas
+        if canvas and not canvas.isClosed():
+            if options[option] == setting:
+                canvas.opsSkipped = canvas.opsSkipped + 1
+                return
+            options[option] = setting
+            if canvas.scheduler:
+                # sent with the next frame; later settings replace this one
+                canvas.scheduler.setOption(self, option, setting)
+            else:
+                canvas.itemconfig(self.id, {option: setting})
+                canvas.opsIssued = canvas.opsIssued + 1
+            canvas._autoflush()
+        else:
+            options[option] = setting
 
 
     def _draw(self, canvas, options):
@@ -609,9 +1321,7 @@ class Rectangle(_BBox):
     def _draw(self, canvas, options):
         p1 = self.p1
         p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
-        return canvas.create_rectangle(x1,y1,x2,y2,options)
+        return canvas.create_rectangle(canvas.toScreenMany((p1.x,p1.y,p2.x,p2.y)),options)
 
     def clone(self):
         other = Rectangle(self.p1, self.p2)
@@ -636,9 +1346,7 @@ class Oval(_BBox):
     def _draw(self, canvas, options):
         p1 = self.p1
         p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
-        return canvas.create_oval(x1,y1,x2,y2,options)
+        return canvas.create_oval(canvas.toScreenMany((p1.x,p1.y,p2.x,p2.y)),options)
 
 class Circle(Oval):
 
@@ -678,9 +1386,7 @@ class Line(_BBox):
     def _draw(self, canvas, options):
         p1 = self.p1
         p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
-        return canvas.create_line(x1,y1,x2,y2,options)
+        return canvas.create_line(canvas.toScreenMany((p1.x,p1.y,p2.x,p2.y)),options)
 
     def setArrow(self, option):
         if not option in ["first","last","both","none"]:
@@ -713,13 +1419,8 @@ class Polygon(GraphicsObject):
             p.move(dx,dy)
 
     def _draw(self, canvas, options):
-        args = [canvas]
-        for p in self.points:
-            x,y = canvas.toScreen(p.x,p.y)
-            args.append(x)
-            args.append(y)
-        args.append(options)
-        return GraphWin.create_polygon(*args)
+        coords = [v for p in self.points for v in (p.x, p.y)]
+        return canvas.create_polygon(canvas.toScreenMany(coords), options)
 
 class Text(GraphicsObject):
 
@@ -787,7 +1488,7 @@ class Entry(GraphicsObject):
         self.anchor = p.clone()
         #print self.anchor
         self.width = width
-        self.text = tk.StringVar(_root)
+        self.text = _newStringVar()
         self.text.set("")
         self.fill = "gray"
         self.color = "black"
@@ -800,6 +1501,8 @@ class Entry(GraphicsObject):
     def _draw(self, canvas, options):
         p = self.anchor
         x,y = canvas.toScreen(p.x,p.y)
+        if canvas.headless:
+            return canvas.create_window(x,y)
         frm = tk.Frame(canvas.master)
         self.entry = tk.Entry(frm,
                               width=self.width,
@@ -824,7 +1527,7 @@ class Entry(GraphicsObject):
     def clone(self):
         other = Entry(self.anchor, self.width)
         other.config = self.config.copy()
-        other.text = tk.StringVar()
+        other.text = _newStringVar()
         other.text.set(self.text.get())
         other.fill = self.fill
         return other
@@ -877,15 +1580,51 @@ class Image(GraphicsObject):
     imageCache = {} # tk photoimages go here to avoid GC while drawn
 
     def __init__(self, p, *pixmap):
-        GraphicsObject.__init__(self, [])
+        GraphicsObject.__init__(self, ["state"])
         self.anchor = p.clone()
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
-        if len(pixmap) == 1: # file name provided
-            self.img = tk.PhotoImage(file=pixmap[0], master=_root)
+        # The picture is only decoded when first needed (see _photo)
+        self._img = None
+        self._source = None
+        self.file = None
+        self.size = None
+        if len(pixmap) == 1 and isinstance(pixmap[0], Image):
+            # share the picture of an existing Image
+            self._source = pixmap[0]
+            self.file = pixmap[0].file
+        elif len(pixmap) == 1: # file name provided
+            self.file = pixmap[0]
         else: # width and height provided
-            width, height = pixmap
-            self.img = tk.PhotoImage(master=_root, width=width, height=height)
+            self.size = pixmap
+
+    def _photo(self, canvas=None):
+        # Decode the picture on first use, for the backend of canvas (or
+        # the default backend if the image is not being drawn)
+        if self._img == None:
+            if self._source != None:
+                self._img = self._source._photo(canvas)
+            else:
+                if canvas:
+                    headless = canvas.headless
+                else:
+                    headless = _headless
+                if self.file:
+                    self._img = _newPhoto(file=self.file, headless=headless)
+                else:
+                    width, height = self.size
+                    self._img = _newPhoto(width=width, height=height,
+                                          headless=headless)
+        return self._img
+
+    def _getImg(self):
+        return self._photo(self.canvas)
+
+    def _setImg(self, img):
+        self._img = img
+        self._source = None
+
+    img = property(_getImg, _setImg)
 
     def __repr__(self):
         return "Image({}, {}, {})".format(self.anchor, self.getWidth(), self.getHeight())
@@ -893,8 +1632,9 @@ class Image(GraphicsObject):
     def _draw(self, canvas, options):
         p = self.anchor
         x,y = canvas.toScreen(p.x,p.y)
-        self.imageCache[self.imageId] = self.img # save a reference
-        return canvas.create_image(x,y,image=self.img)
+        img = self._photo(canvas)
+        self.imageCache[self.imageId] = img # save a reference
+        return canvas.create_image(x,y,image=img,state=options["state"])
 
     def _move(self, dx, dy):
         self.anchor.move(dx,dy)
@@ -909,6 +1649,24 @@ class Image(GraphicsObject):
     def getAnchor(self):
         return self.anchor.clone()
 
+    def setImage(self, image):
+        """Show the picture of another Image in place of this one's. The
+        canvas item is kept, so nothing is decoded or created."""
+        canvas = self.canvas
+        drawn = canvas and not canvas.isClosed()
+        img = image._photo(canvas)
+        if img is self._img:
+            if drawn:
+                canvas.opsSkipped = canvas.opsSkipped + 1
+            return
+        self.img = img
+        self.file = image.file
+        if drawn:
+            self.imageCache[self.imageId] = self.img
+            canvas.itemconfig(self.id, image=self.img)
+            canvas.opsIssued = canvas.opsIssued + 1
+            canvas._autoflush()
+
     def clone(self):
         other = Image(Point(0,0), 0, 0)
         other.img = self.img.copy()
@@ -944,6 +1702,64 @@ class Image(GraphicsObject):
         """
         self.img.put("{" + color +"}", (x, y))
 
+    def _rect(self, x, y, width, height):
+        if width == None:
+            width = self.getWidth() - x
+        if height == None:
+            height = self.getHeight() - y
+        if (x < 0 or y < 0 or width < 0 or height < 0 or
+                x + width > self.getWidth() or y + height > self.getHeight()):
+            raise GraphicsError("pixel rectangle is outside the image")
+        return width, height
+
+    def getPixels(self, x=0, y=0, width=None, height=None):
+        """Returns the RGB values of a width by height rectangle of pixels
+        at (x,y) (by default the whole image) as a bytearray, row by row
+        with 3 bytes per pixel
+
+        """
+
+        width, height = self._rect(x, y, width, height)
+        img = self.img
+        if isinstance(img, _ScenePhoto):
+            return img.getPixels(x, y, width, height)
+        try:
+            data = img.tk.call(img.name, "data", "-format", "ppm",
+                               "-from", x, y, x + width, y + height)
+            if not isinstance(data, bytes):
+                data = data.encode("latin-1")
+            return _parsePPM(data)[2]
+        except tk.TclError:
+            # Tk before 8.6 can only return colors as "#rrggbb" strings
+            rows = img.tk.splitlist(img.tk.call(img.name, "data", "-from",
+                                                x, y, x + width, y + height))
+            pixels = bytearray()
+            for row in rows:
+                for color in img.tk.splitlist(row):
+                    pixels.extend(bytearray.fromhex(color[1:]))
+            return pixels
+
+    def setPixels(self, pixels, x=0, y=0, width=None, height=None):
+        """Sets a width by height rectangle of pixels at (x,y) (by default
+        the whole image) from pixels, which holds 3 bytes (r,g,b) per pixel
+        row by row: bytes, a bytearray, an array('B') or a uint8 NumPy
+        array all work
+
+        """
+
+        width, height = self._rect(x, y, width, height)
+        pixels = memoryview(pixels).tobytes()
+        if len(pixels) != 3*width*height:
+            raise GraphicsError("expected {} bytes of pixels, got {}"
+                                .format(3*width*height, len(pixels)))
+        img = self.img
+        if isinstance(img, _ScenePhoto):
+            img.setPixels(pixels, x, y, width, height)
+        else:
+            header = "P6\n{} {}\n255\n".format(width, height).encode()
+            img.tk.call(img.name, "put", header + pixels, "-format", "ppm",
+                        "-to", x, y)
+
 
     def save(self, filename):
         """Saves the pixmap image to filename.
@@ -956,6 +1772,245 @@ class Image(GraphicsObject):
         self.img.write( filename, format=ext)
 
 
+class Layer:
+
+    """A group of static drawings compiled to plain canvas items in screen
+    coordinates. Drawing a Layer issues one create call per item, all
+    tagged with the layer's tag, without building GraphicsObjects or
+    flushing in between, and undraw removes the whole group at once.
+
+    Layers are compiled from GraphicsObjects with Layer.compile and can
+    be saved with toData/fromData (JSON friendly) so that later runs skip
+    the compile step. Images are referred to by file name."""
+
+    def __init__(self, tag, items=None):
+        self.tag = tag
+        self.items = items or [] # [kind, coords, options] per canvas item
+        self.photos = {}         # file name -> photo, kept while drawn
+        self.canvas = None
+
+    def __repr__(self):
+        return "Layer('{}', {} items)".format(self.tag, len(self.items))
+
+    def imageFiles(self):
+        """Names of the image files the layer refers to. Photos for them
+        can be put in self.photos before drawing to skip loading them."""
+        names = []
+        for kind, coords, options in self.items:
+            if kind == "image" and options["image"] not in names:
+                names.append(options["image"])
+        return names
+
+    @staticmethod
+    def compile(tag, graphwin, objects):
+        """Compile objects into a Layer for windows with the size and
+        coordinates of graphwin"""
+        recorder = HeadlessGraphWin("Layer", graphwin.getWidth(),
+                                    graphwin.getHeight(), autoflush=False)
+        recorder.trans = graphwin.trans
+        items = []
+        for obj in objects:
+            obj.draw(recorder)
+            item = recorder.scene[obj.id]
+            options = dict(item.options)
+            if item.kind == "image":
+                if obj.file == None:
+                    raise GraphicsError("only Images loaded from a file can go in a Layer")
+                options["image"] = obj.file
+            items.append([item.kind, list(item.coords), options])
+            obj.undraw()
+        return Layer(tag, items)
+
+    def draw(self, graphwin):
+        if self.canvas and not self.canvas.isClosed(): raise GraphicsError(OBJ_ALREADY_DRAWN)
+        if graphwin.isClosed(): raise GraphicsError("Can't draw to closed window")
+        self.canvas = graphwin
+        for kind, coords, options in self.items:
+            options = dict(options)
+            options["tags"] = self.tag
+            if kind == "image":
+                name = options["image"]
+                if name not in self.photos:
+                    self.photos[name] = _newPhoto(file=name,
+                                                  headless=graphwin.headless)
+                options["image"] = self.photos[name]
+            getattr(graphwin, "create_" + kind)(*coords, **options)
+        graphwin.opsIssued = graphwin.opsIssued + len(self.items)
+        graphwin._autoflush()
+        return self
+
+    def undraw(self):
+        if not self.canvas: return
+        if not self.canvas.isClosed():
+            self.canvas.delete(self.tag)
+            self.canvas.opsIssued = self.canvas.opsIssued + 1
+            self.canvas._autoflush()
+        self.canvas = None
+        self.photos = {}
+
+    def toData(self):
+        return {"tag": self.tag, "items": self.items}
+
+    kinds = ("rectangle", "oval", "line", "polygon", "text", "image")
+
+    @staticmethod
+    def fromData(data):
+        """Rebuild a Layer saved with toData. Raises GraphicsError if data
+        is not a saved Layer."""
+        try:
+            tag, items = data["tag"], [list(item) for item in data["items"]]
+            for kind, coords, options in items:
+                if (kind not in Layer.kinds or not isinstance(options, dict) or
+                        not all(isinstance(v, (int, float)) for v in coords) or
+                        (kind == "image" and not options.get("image"))):
+                    raise ValueError(kind)
+        except (KeyError, TypeError, ValueError):
+            raise GraphicsError("not a saved Layer")
+        return Layer(tag, items)
+
+
+class _SceneVar:
+
+    """Stand-in for tk.StringVar when Tk is not running"""
+
+    def __init__(self):
+        self.value = ""
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def _newStringVar():
+    if tk:
+        return tk.StringVar(_tkRoot())
+    return _SceneVar()
+
+
+def _readPPM(filename):
+    """Return (width, height, pixels) for a P3 or P6 PPM file, with pixels
+    a bytearray of RGB triples"""
+    with open(filename, "rb") as f:
+        return _parsePPM(f.read(), filename)
+
+
+def _parsePPM(data, name="<data>"):
+    """Like _readPPM, for the contents of a PPM file"""
+    fields = []
+    pos = 0
+    end = len(data)
+    while len(fields) < 4:
+        while pos < end and data[pos:pos+1].isspace():
+            pos = pos + 1
+        if data[pos:pos+1] == b"#":
+            pos = data.find(b"\n", pos)
+            if pos < 0:
+                pos = end
+            continue
+        start = pos
+        while pos < end and not data[pos:pos+1].isspace():
+            pos = pos + 1
+        if pos == end:
+            raise GraphicsError("truncated image file: " + name)
+        fields.append(data[start:pos])
+    magic = fields[0]
+    try:
+        width, height, maxval = int(fields[1]), int(fields[2]), int(fields[3])
+    except ValueError:
+        raise GraphicsError("bad image header: " + name)
+    size = 3*width*height
+    if magic == b"P6":
+        pixels = bytearray(data[pos+1:pos+1+size])
+    elif magic == b"P3":
+        pixels = bytearray(int(v) for v in data[pos:].split()[:size])
+    else:
+        raise GraphicsError("unsupported image file: " + name)
+    if len(pixels) != size:
+        raise GraphicsError("truncated image file: " + name)
+    if maxval != 255:
+        pixels = bytearray(v*255//maxval for v in pixels)
+    return width, height, pixels
+
+
+class _ScenePhoto:
+
+    """Stand-in for tk.PhotoImage when Tk is not running. Pixels live in a
+    bytearray of RGB triples; only PPM files can be read and written."""
+
+    def __init__(self, file=None, width=0, height=0, data=None):
+        if file:
+            width, height, self.pixels = _readPPM(file)
+        elif data:
+            width, height, self.pixels = _parsePPM(data)
+        else:
+            self.pixels = bytearray(3*width*height)
+        self._width = width
+        self._height = height
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def get(self, x, y):
+        i = 3*(y*self._width + x)
+        return tuple(self.pixels[i:i+3])
+
+    def put(self, data, to=None):
+        # data is a Tk color list: rows of "#rrggbb" colors in braces
+        x0, y0 = 0, 0
+        if to:
+            x0, y0 = to[0], to[1]
+        rows = data.replace("}", "").split("{")
+        y = y0
+        for row in rows:
+            colors = row.split()
+            if not colors:
+                continue
+            for dx, color in enumerate(colors):
+                if not color.startswith("#") or len(color) != 7:
+                    raise GraphicsError(BAD_OPTION)
+                i = 3*(y*self._width + x0 + dx)
+                self.pixels[i:i+3] = bytearray.fromhex(color[1:])
+            y = y + 1
+
+    def getPixels(self, x, y, width, height):
+        pixels = bytearray()
+        for row in range(y, y + height):
+            i = 3*(row*self._width + x)
+            pixels.extend(self.pixels[i:i+3*width])
+        return pixels
+
+    def setPixels(self, pixels, x, y, width, height):
+        for row in range(height):
+            i = 3*((y + row)*self._width + x)
+            self.pixels[i:i+3*width] = pixels[3*row*width:3*(row+1)*width]
+
+    def copy(self):
+        other = _ScenePhoto(width=self._width, height=self._height)
+        other.pixels[:] = self.pixels
+        return other
+
+    def write(self, filename, format=None):
+        with open(filename, "wb") as f:
+            f.write("P6\n{} {}\n255\n".format(self._width, self._height).encode())
+            f.write(bytes(self.pixels))
+
+
+def _newPhoto(file=None, width=0, height=0, headless=False, data=None):
+    # data is the contents of a PPM file, already in memory
+    if headless or tk == None:
+        return _ScenePhoto(file=file, width=width, height=height, data=data)
+    if data:
+        return tk.PhotoImage(data=data, format="ppm", master=_tkRoot())
+    if file:
+        return tk.PhotoImage(file=file, master=_tkRoot())
+    return tk.PhotoImage(master=_tkRoot(), width=width, height=height)
+
+
 def color_rgb(r,g,b):
     """r,g,b are intensities of red, green, and blue in range(256)
     Returns color specifier string for the resulting color"""
@@ -0,0 +1,94 @@
+# graphics_test.py
+"""Tests for the headless GraphWin.
+
+    python3 -m unittest graphics_test
+"""
+
+import unittest
+from graphics import GraphWin, HeadlessGraphWin, GraphicsError, Point, Rectangle, Text
+
+
+class HeadlessGraphWinTest(unittest.TestCase):
+
+    def setUp(self):
+        self.win = GraphWin("test", 200, 100, headless=True)
+        self.win.setCoords(0, 0, 100, 100)
+
+    def tearDown(self):
+        self.win.close()
+
+    def test_headless_class(self):
+        self.assertIsInstance(self.win, HeadlessGraphWin)
+        self.assertEqual(self.win.getWidth(), 200)
+        self.assertEqual(self.win.getHeight(), 100)
+
+    def test_drawing_goes_into_scene(self):
+        box = Rectangle(Point(10, 20), Point(30, 40))
+        box.setFill("red")
+        box.draw(self.win)
+        label = Text(Point(50, 50), "hello")
+        label.draw(self.win)
+        self.assertEqual(len(self.win.find_all()), 2)
+        self.assertEqual(self.win.type(box.id), "rectangle")
+        self.assertEqual(self.win.itemcget(box.id, "fill"), "red")
+        self.assertEqual(self.win.itemcget(label.id, "text"), "hello")
+        x1, y1 = self.win.toScreen(10, 20)
+        x2, y2 = self.win.toScreen(30, 40)
+        self.assertEqual(self.win.coords(box.id), [x1, y1, x2, y2])
+        box.move(10, 0)
+        moved = self.win.toScreen(20, 20) + self.win.toScreen(40, 40)
+        for got, want in zip(self.win.coords(box.id), moved):
+            self.assertAlmostEqual(got, want, delta=1) # toScreen rounds
+        box.undraw()
+        self.assertEqual(self.win.find_all(), (label.id,))
+
+    def test_scripted_clicks(self):
+        self.win.feedClicks([(25, 50), Point(75, 10)])
+        p = self.win.getMouse()
+        self.assertEqual((p.getX(), p.getY()), (25, 50))
+        p = self.win.getMouse()
+        self.assertEqual((p.getX(), p.getY()), (75, 10))
+        self.assertRaises(GraphicsError, self.win.getMouse)
+
+    def test_check_mouse(self):
+        self.assertEqual(self.win.checkMouse(), None)
+        self.win.feedClick(5, 5)
+        p = self.win.checkMouse()
+        self.assertEqual((p.getX(), p.getY()), (5, 5))
+        self.assertEqual(self.win.checkMouse(), None)
+
+    def test_scripted_keys(self):
+        self.win.feedKeys(["a", "Return"])
+        self.assertEqual(self.win.getKey(), "a")
+        self.assertEqual(self.win.checkKey(), "Return")
+        self.assertEqual(self.win.checkKey(), "")
+
+    def test_next_event_in_order(self):
+        self.win.feedClick(1, 2)
+        self.win.feedKey("x")
+        self.assertEqual(self.win.nextEvent().kind, "click")
+        self.assertEqual(self.win.nextEvent().key, "x")
+        self.assertEqual(self.win.nextEvent(timeout=0), None)
+
+    def test_timers(self):
+        ran = []
+        self.win.after(0, ran.append, "now")
+        self.win.update()
+        self.assertEqual(ran, ["now"])
+        # getMouse runs the timers until one gives it a click, however late
+        self.win.after(60000, self.win.feedClick, 3, 4)
+        cancelled = self.win.after(1, ran.append, "cancelled")
+        self.win.after_cancel(cancelled)
+        p = self.win.getMouse()
+        self.assertEqual((p.getX(), p.getY()), (3, 4))
+        self.assertEqual(ran, ["now"])
+
+    def test_closed(self):
+        self.win.close()
+        self.assertTrue(self.win.isClosed())
+        self.assertRaises(GraphicsError, self.win.getMouse)
+        self.assertRaises(GraphicsError, self.win.checkMouse)
+
+
+if __name__ == "__main__":
+    unittest.main()
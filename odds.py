@@ -0,0 +1,123 @@
+# odds.py
+"""Battle odds for Big Red R!sk
+
+One attack in the game (roll_dice in simple.ml) rolls min(attackers-1, 3)
+dice against min(defenders, 2); the highest dice are compared pairwise and
+ties go to the defender. A battle is attacking again and again until the
+defender is wiped out or the attacker is down to one troop. The chances
+of winning a battle, and the troops each side can expect to lose, follow
+exactly from the Markov chain over (attackers, defenders), which OddsTable
+solves once for all counts up to a cap so that each lookup is two list
+indexes.
+"""
+
+import json
+import os
+
+cacheDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+defaultCap = int(os.environ.get("RISK_ODDS_CAP", "40"))
+version = 1 # bump when the rules change so cached tables are rebuilt
+
+
+def rollOutcomes(attackDice, defendDice):
+    """Return [(attacker loss, defender loss, probability)] for one roll"""
+    import itertools
+    counts = {}
+    for dice in itertools.product(range(1, 7), repeat=attackDice + defendDice):
+        attack = sorted(dice[:attackDice], reverse=True)
+        defend = sorted(dice[attackDice:], reverse=True)
+        lost = [0, 0]
+        for a, d in zip(attack, defend):
+            if a > d:
+                lost[1] = lost[1] + 1
+            else:
+                lost[0] = lost[0] + 1
+        counts[tuple(lost)] = counts.get(tuple(lost), 0) + 1
+    total = 6.0**(attackDice + defendDice)
+    return [(a, d, n/total) for (a, d), n in sorted(counts.items())]
+
+
+class OddsTable:
+
+    """Exact battle odds for up to cap troops on each side.
+
+    lookup(attackers, defenders) gives (chance the attacker takes the
+    country, expected attacker losses, expected defender losses), where
+    attackers counts every troop in the attacking country."""
+
+    def __init__(self, cap=defaultCap, data=None):
+        self.cap = cap
+        if data:
+            self.win, self.attackerLoss, self.defenderLoss = data
+        else:
+            self._solve()
+
+    def _solve(self):
+        cap = self.cap
+        outcomes = {}
+        for a in range(1, 4):
+            for d in range(1, 3):
+                outcomes[a, d] = rollOutcomes(a, d)
+        # rows are attackers (0..cap), columns defenders (0..cap)
+        win = [[0.0]*(cap + 1) for a in range(cap + 1)]
+        attackerLoss = [[0.0]*(cap + 1) for a in range(cap + 1)]
+        defenderLoss = [[0.0]*(cap + 1) for a in range(cap + 1)]
+        for a in range(1, cap + 1):
+            win[a][0] = 1.0
+            for d in range(1, cap + 1):
+                if a < 2:
+                    continue # cannot attack: lost, nothing more happens
+                w = lossA = lossD = 0.0
+                for la, ld, p in outcomes[min(a - 1, 3), min(d, 2)]:
+                    w = w + p*win[a - la][d - ld]
+                    lossA = lossA + p*(la + attackerLoss[a - la][d - ld])
+                    lossD = lossD + p*(ld + defenderLoss[a - la][d - ld])
+                win[a][d] = w
+                attackerLoss[a][d] = lossA
+                defenderLoss[a][d] = lossD
+        self.win = win
+        self.attackerLoss = attackerLoss
+        self.defenderLoss = defenderLoss
+
+    def lookup(self, attackers, defenders):
+        """Odds for attackers troops against defenders troops. Counts above
+        the cap are treated as the cap."""
+        a = max(0, min(attackers, self.cap))
+        d = max(0, min(defenders, self.cap))
+        return self.win[a][d], self.attackerLoss[a][d], self.defenderLoss[a][d]
+
+    def toData(self):
+        return [self.win, self.attackerLoss, self.defenderLoss]
+
+
+_tables = {}
+
+def oddsTable(cap=defaultCap):
+    """Return the OddsTable for cap, solving it only if it is neither in
+    memory nor cached in .cache"""
+    if cap in _tables:
+        return _tables[cap]
+    cacheFile = os.path.join(cacheDir, "odds-{}-v{}.json".format(cap, version))
+    try:
+        with open(cacheFile) as f:
+            table = OddsTable(cap, json.load(f))
+    except (IOError, OSError, ValueError):
+        table = OddsTable(cap)
+        try:
+            if not os.path.isdir(cacheDir):
+                os.makedirs(cacheDir)
+            tmp = cacheFile + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(table.toData(), f)
+            os.rename(tmp, cacheFile)
+        except (IOError, OSError):
+            pass # no cache this time
+    _tables[cap] = table
+    return table
+
+
+def describe(attackers, defenders, cap=defaultCap):
+    """One line summary of the odds, for the notification bar"""
+    win, lossA, lossD = oddsTable(cap).lookup(attackers, defenders)
+    return "Odds to take it: {:.0%} (you lose ~{:.1f}, they lose ~{:.1f})".format(
+        win, lossA, lossD)
@@ -0,0 +1,118 @@
+# odds_test.py
+"""Tests for the battle odds.
+
+    python3 -m unittest odds_test
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import odds
+
+
+def battle(rng, attackers, defenders):
+    # Play out one battle with real dice, as roll_dice in simple.ml does
+    start = attackers, defenders
+    while attackers >= 2 and defenders > 0:
+        attack = sorted((rng.randint(1, 6) for i in range(min(attackers - 1, 3))), reverse=True)
+        defend = sorted((rng.randint(1, 6) for i in range(min(defenders, 2))), reverse=True)
+        for a, d in zip(attack, defend):
+            if a > d:
+                defenders = defenders - 1
+            else:
+                attackers = attackers - 1
+    return defenders == 0, start[0] - attackers, start[1] - defenders
+
+
+class RollTest(unittest.TestCase):
+
+    def outcomes(self, a, d):
+        return dict(((la, ld), p) for la, ld, p in odds.rollOutcomes(a, d))
+
+    def test_one_against_one(self):
+        # ties go to the defender
+        self.assertEqual(self.outcomes(1, 1), {(0, 1): 15/36.0, (1, 0): 21/36.0})
+
+    def test_three_against_two(self):
+        outcomes = self.outcomes(3, 2)
+        self.assertAlmostEqual(outcomes[0, 2], 2890/7776.0)
+        self.assertAlmostEqual(outcomes[1, 1], 2611/7776.0)
+        self.assertAlmostEqual(outcomes[2, 0], 2275/7776.0)
+
+    def test_sums_to_one(self):
+        for a in range(1, 4):
+            for d in range(1, 3):
+                self.assertAlmostEqual(sum(p for la, ld, p in odds.rollOutcomes(a, d)), 1.0)
+
+
+class OddsTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = odds.OddsTable(12)
+
+    def test_known_values(self):
+        # 3 troops roll two dice against one; if that fails, one against one
+        win, lossA, lossD = self.table.lookup(3, 1)
+        self.assertAlmostEqual(win, 125/216.0 + 91/216.0*15/36.0)
+        self.assertAlmostEqual(win, 0.75, places=2)
+        self.assertAlmostEqual(lossA, 91/216.0*(1 + 21/36.0))
+        self.assertAlmostEqual(lossD, win)
+        self.assertAlmostEqual(self.table.lookup(2, 1)[0], 15/36.0)
+
+    def test_edges(self):
+        self.assertEqual(self.table.lookup(5, 0), (1.0, 0.0, 0.0))
+        self.assertEqual(self.table.lookup(1, 3), (0.0, 0.0, 0.0))
+        # counts above the cap are the cap
+        self.assertEqual(self.table.lookup(50, 4), self.table.lookup(12, 4))
+
+    def test_more_attackers_win_more(self):
+        for d in range(1, 13):
+            chances = [self.table.lookup(a, d)[0] for a in range(1, 13)]
+            self.assertEqual(chances, sorted(chances))
+
+    def test_against_dice(self):
+        rng = random.Random(3110)
+        games = 20000
+        for a, d in [(5, 3), (10, 10)]:
+            results = [battle(rng, a, d) for i in range(games)]
+            win, lossA, lossD = self.table.lookup(a, d)
+            won = sum(r[0] for r in results)/float(games)
+            error = (win*(1 - win)/games)**0.5
+            self.assertTrue(abs(won - win) < 4*error, "{} vs {}: {} != {}".format(a, d, won, win))
+            self.assertAlmostEqual(sum(r[1] for r in results)/float(games), lossA, delta=0.1)
+            self.assertAlmostEqual(sum(r[2] for r in results)/float(games), lossD, delta=0.1)
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cacheDir = odds.cacheDir
+        self.tables = odds._tables
+        odds.cacheDir = tempfile.mkdtemp()
+        odds._tables = {}
+
+    def tearDown(self):
+        shutil.rmtree(odds.cacheDir)
+        odds.cacheDir = self.cacheDir
+        odds._tables = self.tables
+
+    def test_cached_table(self):
+        solved = odds.oddsTable(8)
+        self.assertEqual(os.listdir(odds.cacheDir), ["odds-8-v{}.json".format(odds.version)])
+        odds._tables = {}
+        cached = odds.oddsTable(8)
+        self.assertIsNot(cached, solved)
+        for a in range(9):
+            for d in range(9):
+                for x, y in zip(cached.lookup(a, d), solved.lookup(a, d)):
+                    self.assertAlmostEqual(x, y)
+
+    def test_describe(self):
+        self.assertEqual(odds.describe(3, 1, cap=8),
+                         "Odds to take it: 75% (you lose ~0.7, they lose ~0.8)")
+
+
+if __name__ == "__main__":
+    unittest.main()
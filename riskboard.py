@@ -0,0 +1,140 @@
+# riskboard.py
+"""Board definitions for Big Red R!sk
+
+A board is a JSON file. boards/cornell.json is the Cornell board of
+board.ml:
+
+    {"continents": [
+      {"name": "West Campus", "bonus": 5, "box": [5, 30, 25, 60], "territories": [
+        {"name": "Becker", "box": [7, 50, 12, 56], "borders": ["Cook", "Rose"]},
+        ...]},
+      ...],
+     "lines": [[13.5, 43, 9.5, 39], ...]}
+
+Boxes are [x1, y1, x2, y2] in the window's 100 by 100 coordinates. Names
+are drawn centred just above their box and a continent's bonus by its top
+left corner; "label" or "bonusLabel" ([x, y]) put them somewhere else.
+"lines" are the connections drawn between territories. Borders must go
+both ways.
+
+load() reads and checks a board file once and keeps it. RISK_BOARD names
+the board the window and risksim use; continents and borders are that
+board's, in the same form as before boards were files.
+"""
+
+import json
+import os
+
+boardDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "boards")
+defaultBoard = os.path.join(boardDir, "cornell.json")
+
+
+class BoardError(ValueError):
+
+    """A board file that cannot be used"""
+
+
+class Board:
+
+    """A checked board. Territories are listed continent by continent.
+
+    continents   [(name, bonus, [territory names])]
+    borders      {territory: [territories it borders]}
+    boxes        {territory: (x1, y1, x2, y2)}
+    labels       {territory: (x, y)} where its name is drawn
+    regions      [(name, box, label, bonusLabel)] for each continent
+    lines        [(x1, y1, x2, y2)] connections to draw"""
+
+    def __init__(self, data, filename="board"):
+        self.filename = filename
+        self.continents = []
+        self.borders = {}
+        self.boxes = {}
+        self.labels = {}
+        self.regions = []
+        self.lines = []
+        try:
+            self._read(data)
+        except (KeyError, TypeError, ValueError) as e:
+            if isinstance(e, BoardError):
+                raise
+            self._fail("malformed board ({}: {})".format(type(e).__name__, e))
+        self._check()
+
+    def _fail(self, message):
+        raise BoardError("{}: {}".format(self.filename, message))
+
+    def _box(self, value, what):
+        box = tuple(float(v) for v in value)
+        if len(box) != 4 or box[0] >= box[2] or box[1] >= box[3]:
+            self._fail("{} needs a box [x1, y1, x2, y2] with x1 < x2 and y1 < y2".format(what))
+        return box
+
+    def _point(self, value, default):
+        if value == None:
+            return default
+        x, y = value
+        return (float(x), float(y))
+
+    def _read(self, data):
+        for continent in data["continents"]:
+            name = continent["name"]
+            bonus = int(continent["bonus"])
+            area = self._box(continent["box"], name)
+            label = self._point(continent.get("label"), ((area[0] + area[2])/2, area[3] + 0.6))
+            bonusLabel = self._point(continent.get("bonusLabel"), (area[0] - 1, area[3] - 2))
+            territories = []
+            for territory in continent["territories"]:
+                country = territory["name"]
+                if country in self.boxes:
+                    self._fail("{} is on the board twice".format(country))
+                territories.append(country)
+                self.boxes[country] = box = self._box(territory["box"], country)
+                self.labels[country] = self._point(territory.get("label"),
+                                                   ((box[0] + box[2])/2, box[3] + 0.6))
+                self.borders[country] = list(territory["borders"])
+            if not territories:
+                self._fail("{} has no territories".format(name))
+            self.continents.append((name, bonus, territories))
+            self.regions.append((name, area, label, bonusLabel))
+        self.lines = [tuple(float(v) for v in line) for line in data.get("lines", [])]
+        if any(len(line) != 4 for line in self.lines):
+            self._fail("lines are [x1, y1, x2, y2]")
+
+    def _check(self):
+        if not self.continents:
+            self._fail("no continents")
+        for country, others in self.borders.items():
+            for other in others:
+                if other not in self.borders:
+                    self._fail("{} borders {}, which is not on the board".format(country, other))
+                if other == country:
+                    self._fail("{} borders itself".format(country))
+                if others.count(other) > 1:
+                    self._fail("{} lists {} twice".format(country, other))
+                if country not in self.borders[other]:
+                    self._fail("{} borders {} but not the other way round".format(country, other))
+
+    def territories(self):
+        return [name for continent in self.continents for name in continent[2]]
+
+
+_boards = {}
+
+def load(filename=None):
+    """Return the Board in filename (RISK_BOARD, else the Cornell board),
+    reading and checking it only the first time"""
+    filename = os.path.abspath(filename or os.environ.get("RISK_BOARD") or defaultBoard)
+    if filename not in _boards:
+        try:
+            with open(filename) as f:
+                data = json.load(f)
+        except ValueError as e:
+            raise BoardError("{}: not JSON ({})".format(filename, e))
+        _boards[filename] = Board(data, filename)
+    return _boards[filename]
+
+
+board = load()
+continents = board.continents
+borders = board.borders
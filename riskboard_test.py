@@ -0,0 +1,139 @@
+# riskboard_test.py
+"""Tests for reading and checking board files.
+
+    python3 -m unittest riskboard_test
+"""
+
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import riskboard
+from riskboard import Board, BoardError
+
+# Two continents of two territories, A and B bordering across them
+small = {"continents": [
+    {"name": "North", "bonus": 2, "box": [0, 50, 40, 90], "territories": [
+        {"name": "A", "box": [5, 60, 15, 70], "borders": ["A2", "B"]},
+        {"name": "A2", "box": [20, 60, 30, 70], "borders": ["A"]}]},
+    {"name": "South", "bonus": 3, "box": [0, 0, 40, 40], "territories": [
+        {"name": "B", "box": [5, 10, 15, 20], "borders": ["A", "B2"],
+         "label": [1, 2]},
+        {"name": "B2", "box": [20, 10, 30, 20], "borders": ["B"]}]}],
+    "lines": [[10, 60, 10, 20]]}
+
+
+def territory(data, name):
+    for continent in data["continents"]:
+        for t in continent["territories"]:
+            if t["name"] == name:
+                return t
+
+
+class BoardTest(unittest.TestCase):
+
+    def fails(self, change, message):
+        # change edits a copy of small; the Board must refuse it with message
+        data = copy.deepcopy(small)
+        change(data)
+        try:
+            Board(data, "test.json")
+        except BoardError as e:
+            self.assertIn(message, str(e))
+            self.assertTrue(str(e).startswith("test.json: "))
+        else:
+            self.fail("no BoardError for " + message)
+
+    def test_small_board(self):
+        board = Board(copy.deepcopy(small))
+        self.assertEqual(board.continents, [("North", 2, ["A", "A2"]), ("South", 3, ["B", "B2"])])
+        self.assertEqual(board.territories(), ["A", "A2", "B", "B2"])
+        self.assertEqual(board.borders["A"], ["A2", "B"])
+        self.assertEqual(board.boxes["B"], (5.0, 10.0, 15.0, 20.0))
+        self.assertEqual(board.labels["B"], (1.0, 2.0))
+        self.assertEqual(board.labels["A"], (10.0, 70.6))
+        self.assertEqual(board.regions[1], ("South", (0.0, 0.0, 40.0, 40.0), (20.0, 40.6), (-1.0, 38.0)))
+        self.assertEqual(board.lines, [(10.0, 60.0, 10.0, 20.0)])
+
+    def test_cornell_board(self):
+        board = riskboard.load(riskboard.defaultBoard)
+        self.assertEqual([c[0] for c in board.continents],
+                         ["West Campus", "North Campus", "Central Campus", "Ag. Quad", "Collegetown"])
+        self.assertEqual(len(board.territories()), 24)
+        self.assertIn("Becker", board.territories())
+
+    def test_malformed(self):
+        self.fails(lambda data: data.pop("continents"), "malformed board (KeyError")
+        self.fails(lambda data: territory(data, "A").pop("borders"), "malformed board (KeyError")
+        self.fails(lambda data: data["continents"][0].update(bonus=None), "malformed board (TypeError")
+        self.fails(lambda data: data["continents"][0].update(bonus="two"), "malformed board (ValueError")
+
+    def test_bad_box(self):
+        message = "needs a box [x1, y1, x2, y2] with x1 < x2 and y1 < y2"
+        self.fails(lambda data: territory(data, "A").update(box=[15, 60, 5, 70]), "A " + message)
+        self.fails(lambda data: territory(data, "A").update(box=[5, 60, 15]), "A " + message)
+        self.fails(lambda data: data["continents"][1].update(box=[0, 40, 40, 40]), "South " + message)
+
+    def test_twice_on_board(self):
+        self.fails(lambda data: data["continents"][1]["territories"].append(territory(data, "A")),
+                   "A is on the board twice")
+
+    def test_no_territories(self):
+        self.fails(lambda data: data["continents"][0].update(territories=[]),
+                   "North has no territories")
+
+    def test_bad_lines(self):
+        self.fails(lambda data: data.update(lines=[[1, 2, 3]]), "lines are [x1, y1, x2, y2]")
+
+    def test_no_continents(self):
+        self.fails(lambda data: data.update(continents=[]), "no continents")
+
+    def test_unknown_border(self):
+        self.fails(lambda data: territory(data, "A")["borders"].append("C"),
+                   "A borders C, which is not on the board")
+
+    def test_borders_itself(self):
+        self.fails(lambda data: territory(data, "A")["borders"].append("A"), "A borders itself")
+
+    def test_border_twice(self):
+        self.fails(lambda data: territory(data, "B2")["borders"].append("B"), "B2 lists B twice")
+
+    def test_one_way_border(self):
+        self.fails(lambda data: territory(data, "A2")["borders"].append("B2"),
+                   "A2 borders B2 but not the other way round")
+
+
+class LoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, text):
+        filename = os.path.join(self.dir, name)
+        with open(filename, "w") as f:
+            f.write(text)
+        return filename
+
+    def test_not_json(self):
+        filename = self.write("broken.json", '{"continents": [')
+        try:
+            riskboard.load(filename)
+        except BoardError as e:
+            self.assertIn(filename + ": not JSON", str(e))
+        else:
+            self.fail("no BoardError for a file that is not JSON")
+
+    def test_loaded_once(self):
+        filename = self.write("small.json", json.dumps(small))
+        board = riskboard.load(filename)
+        self.assertIs(riskboard.load(filename), board)
+        riskboard._boards.pop(filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
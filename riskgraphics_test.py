@@ -0,0 +1,172 @@
+# riskgraphics_test.py
+"""Tests for the window's bookkeeping that needs no screen.
+
+    GRAPHICS_BACKEND=headless python3 -m unittest riskgraphics_test
+"""
+
+import os
+os.environ.setdefault("GRAPHICS_BACKEND", "headless")
+
+import random
+import unittest
+import riskgraphics
+from riskboard import board, continents, borders
+
+players = ["Player one", "Player two", "Player three", "Player four"]
+
+
+def clickable():
+    # Every clickable rectangle in the order buildHitIndex adds them
+    riskgraphics.initBoardObjects()
+    regions = []
+    for country in riskgraphics.countriesDict:
+        box = riskgraphics.countriesDict[country][0]
+        regions.append((box.p1.x, box.p1.y, box.p2.x, box.p2.y, (country,True)))
+    button = riskgraphics.endTurnButton
+    regions.append((button.p1.x, button.p1.y, button.p2.x, button.p2.y, ("End turn",False)))
+    return regions
+
+def scan(regions, x, y):
+    # What a click at (x,y) hits, checking every rectangle
+    for x1, y1, x2, y2, value in regions:
+        if min(x1,x2) <= x <= max(x1,x2) and min(y1,y2) <= y <= max(y1,y2):
+            return value
+    return None
+
+
+class HitTestTest(unittest.TestCase):
+
+    def test_country_centers(self):
+        for country in board.territories():
+            x1, y1, x2, y2 = board.boxes[country]
+            self.assertEqual(riskgraphics.hitTest((x1+x2)/2.0, (y1+y2)/2.0),
+                             (country,True))
+
+    def test_country_borders(self):
+        # Edges and corners are in the box; a little past them is not
+        for country in board.territories():
+            x1, y1, x2, y2 = board.boxes[country]
+            for x, y in [(x1,y1), (x2,y2), (x1,(y1+y2)/2.0), ((x1+x2)/2.0,y2)]:
+                self.assertEqual(riskgraphics.hitTest(x, y), (country,True))
+            for x, y in [(x1-0.01,y1), (x2+0.01,y2), (x1,y1-0.01), (x2,y2+0.01)]:
+                self.assertNotEqual(riskgraphics.hitTest(x, y), (country,True))
+
+    def test_end_turn_button(self):
+        button = riskgraphics.endTurnButton
+        center = button.getCenter()
+        self.assertEqual(riskgraphics.hitTest(center.x, center.y), ("End turn",False))
+
+    def test_matches_scan(self):
+        # Every quarter unit of the window, grid cell edges included
+        regions = clickable()
+        for i in range(401):
+            for j in range(401):
+                x, y = i/4.0, j/4.0
+                self.assertEqual(riskgraphics.hitTest(x, y), scan(regions, x, y),
+                                 "click at ({}, {})".format(x, y))
+
+    def test_grid_cells(self):
+        # Rectangles that span several cells, or sit on a cell edge
+        grid = riskgraphics.HitGrid(5)
+        grid.add(3, 3, 12, 4, "wide")
+        grid.add(10, 10, 5, 20, "flipped")
+        self.assertEqual(grid.lookup(11, 3.5), "wide")
+        self.assertEqual(grid.lookup(5, 10), "flipped")
+        self.assertEqual(grid.lookup(10, 20), "flipped")
+        self.assertEqual(grid.lookup(10.5, 15), None)
+        self.assertEqual(grid.lookup(-1, -1), None)
+
+
+class Position:
+
+    """The owner and troops of each country, in plain dicts"""
+
+    def __init__(self):
+        self.owner = {}
+        self.troops = {}
+
+    def reachable(self, country):
+        # Breadth first search through the owner's countries
+        player = self.owner.get(country)
+        if player == None:
+            return set()
+        seen = set([country])
+        frontier = [country]
+        while frontier:
+            following = []
+            for c in frontier:
+                for other in borders[c]:
+                    if other not in seen and self.owner.get(other) == player:
+                        seen.add(other)
+                        following.append(other)
+            frontier = following
+        return seen
+
+    def attackable(self, country):
+        player = self.owner.get(country)
+        if player == None or self.troops[country] < 2:
+            return set()
+        return set(other for other in borders[country]
+                   if self.owner.get(other) not in (None, player))
+
+
+class StateMirrorTest(unittest.TestCase):
+
+    def check(self, mirror, position):
+        for player in players:
+            held = [c for c in position.owner if position.owner[c] == player]
+            self.assertEqual(mirror.territoriesOf(player), len(held))
+            self.assertEqual(mirror.troopsOf(player), sum(position.troops[c] for c in held))
+            whole = [c for c, (name, bonus, countries) in enumerate(continents)
+                     if all(position.owner.get(country) == player for country in countries)]
+            self.assertEqual(mirror.continentsOf(player), whole)
+            self.assertEqual(mirror.continentBonus(player),
+                             sum(continents[c][1] for c in whole))
+        for country in board.territories():
+            self.assertEqual(mirror.ownerOf(country), position.owner.get(country))
+            self.assertEqual(mirror.troopsIn(country), position.troops.get(country, 0))
+            self.assertEqual(set(mirror.reachable(country)), position.reachable(country))
+            self.assertEqual(set(mirror.attackable(country)), position.attackable(country))
+
+    def test_against_search(self):
+        rng = random.Random(3110)
+        countries = board.territories()
+        mirror = riskgraphics.StateMirror(continents, borders)
+        position = Position()
+        self.check(mirror, position)
+        for step in range(2000):
+            country = rng.choice(countries)
+            if rng.random() < 0.05:
+                mirror.clear(country)
+                position.owner.pop(country, None)
+                position.troops.pop(country, None)
+            else:
+                # mostly two players, so groups join and split often
+                player = rng.choice(players[:2] if step % 500 < 400 else players)
+                troops = rng.randint(1, 5)
+                mirror.set(country, player, troops)
+                position.owner[country] = player
+                position.troops[country] = troops
+            if step % 10 == 0:
+                self.check(mirror, position)
+        self.check(mirror, position)
+
+    def test_whole_board(self):
+        # One player holding everything has one group and every continent
+        mirror = riskgraphics.StateMirror(continents, borders)
+        for country in board.territories():
+            mirror.set(country, "Player one", 1)
+        self.assertEqual(len(mirror._components("Player one")), 1)
+        self.assertEqual(mirror.territoriesOf("Player one"), len(board.territories()))
+        self.assertEqual(mirror.continentsOf("Player one"), list(range(len(continents))))
+        self.assertEqual(mirror.attackable(board.territories()[0]), [])
+
+    def test_borders(self):
+        mirror = riskgraphics.StateMirror(continents, borders)
+        for country in board.territories():
+            for other in board.territories():
+                self.assertEqual(mirror.borders(country, other), other in borders[country])
+
+
+if __name__ == "__main__":
+    unittest.main()
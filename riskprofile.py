@@ -0,0 +1,119 @@
+# riskprofile.py
+"""Opt-in profiling of the Big Red R!sk window
+
+Run the game with RISK_PROFILE set to a file name (or to 1, for
+riskprofile.json) to time every public riskgraphics function, every
+GraphWin flush and every run of the Tk event loop. When the process exits
+the file gets, for each of them: the number of calls, the total, median
+(p50) and p99 wall time in ms, and the canvas operations issued to Tk
+during the calls (see GraphWin.getOpStats).
+
+Times are inclusive, so updateBoard includes the update, paintCountry and
+flush calls it makes. Time the game spends waiting in getMouse is not
+counted as event loop time.
+"""
+
+import atexit
+import json
+import os
+import sys
+import time
+from functools import wraps
+import graphics
+
+clock = getattr(time, "perf_counter", time.time)
+
+
+class Stat:
+
+    """Timings of one profiled function"""
+
+    __slots__ = ("calls", "times", "ops")
+
+    def __init__(self):
+        self.calls = 0
+        self.times = []
+        self.ops = 0
+
+    def summary(self):
+        times = sorted(self.times)
+        def percentile(p):
+            return 1000*times[min(len(times) - 1, int(p*len(times)))]
+        return {"calls": self.calls, "totalMs": 1000*sum(times),
+                "p50Ms": percentile(0.5), "p99Ms": percentile(0.99),
+                "tkOps": self.ops}
+
+
+class Profile:
+
+    """Collects Stats for functions wrapped with wrap(). ops is a function
+    returning the running count of canvas operations issued."""
+
+    def __init__(self, ops=None):
+        self.stats = {}
+        self.ops = ops or (lambda: 0)
+
+    def wrap(self, name, func):
+        stat = self.stats.setdefault(name, Stat())
+        ops = self.ops
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            ops0 = ops()
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stat.times.append(clock() - start)
+                stat.calls = stat.calls + 1
+                stat.ops = stat.ops + ops() - ops0
+        profiled.profiledFunction = func
+        return profiled
+
+    def report(self):
+        return dict((name, stat.summary())
+                    for name, stat in self.stats.items() if stat.calls)
+
+    def dump(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.report(), f, indent=2, sort_keys=True)
+
+
+def _wrapMethods(profile, cls, names, prefix):
+    for name in names:
+        if name in cls.__dict__:
+            setattr(cls, name, profile.wrap(prefix + name, cls.__dict__[name]))
+
+
+def install(moduleName, filename=None):
+    """Profile the public functions of the module and the graphics flush
+    points, and write the report to filename at exit"""
+    module = sys.modules[moduleName]
+    if filename == None:
+        filename = os.environ.get("RISK_PROFILE", "1")
+        if filename == "1":
+            filename = "riskprofile.json"
+
+    def ops():
+        win = getattr(module, "boardWindow", None)
+        if win:
+            return win.opsIssued
+        return 0
+    profile = Profile(ops)
+
+    for name, value in list(vars(module).items()):
+        if (not name.startswith("_") and callable(value) and
+                getattr(value, "__module__", None) == moduleName and
+                not isinstance(value, type)):
+            setattr(module, name, profile.wrap(name, value))
+
+    graphics._updateRoot = profile.wrap("tk.update", graphics._updateRoot)
+    for cls in (graphics.GraphWin, graphics.HeadlessGraphWin):
+        _wrapMethods(profile, cls, ["flush", "_autoflush", "commitBatch"],
+                     cls.__name__ + ".")
+    _wrapMethods(profile, graphics.RenderScheduler, ["commit"],
+                 "RenderScheduler.")
+    if graphics.tk != None:
+        graphics.GraphWin.update = profile.wrap("tk.update", graphics.tk.Canvas.update)
+
+    atexit.register(profile.dump, filename)
+    return profile
@@ -0,0 +1,191 @@
+# riskrecord.py
+"""Recording and replay of riskgraphics calls
+
+Run the game with RISK_RECORD set to a file name and every call the game
+makes into riskgraphics (drawBoard, post, clicker, updateDice, endgame,
+...) is logged with its arguments, its result and the time it was made,
+one JSON list per line:
+
+    [seconds since start, function name, arguments, result]
+
+Calls riskgraphics makes to itself are not logged. Tuples are written as
+{"t": [...]} and windows as {"win": n} so that replay gets back exactly
+what the game passed in. The game thread only timestamps the call and
+queues it; a background thread encodes and writes the log.
+
+Replay a log with
+
+    python3 riskrecord.py game.log [--fast]
+
+at the speed it was recorded, or with --fast as fast as possible. The
+recorded answer to each clicker (and the click that closes the endgame
+screen) is clicked for you. Set GRAPHICS_BACKEND=headless to replay
+without a display.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+try:
+    import queue
+except ImportError:
+    import Queue as queue # Python 2
+from functools import wraps
+import graphics
+from graphics import GraphWin, Point
+
+clock = getattr(time, "monotonic", time.time)
+
+
+def encode(value, windows):
+    if isinstance(value, tuple):
+        return {"t": [encode(v, windows) for v in value]}
+    if isinstance(value, list):
+        return [encode(v, windows) for v in value]
+    if isinstance(value, GraphWin):
+        return {"win": windows.get(id(value), -1)}
+    return value
+
+
+def decode(value, windows):
+    if isinstance(value, list):
+        return [decode(v, windows) for v in value]
+    if isinstance(value, dict):
+        if "t" in value:
+            return tuple(decode(v, windows) for v in value["t"])
+        return windows[value["win"]]
+    return value
+
+
+class Recorder:
+
+    """Writes logged calls to a file from a background thread"""
+
+    def __init__(self, filename):
+        self.file = open(filename, "w")
+        self.start = clock()
+        self.windows = {} # id(window) -> number, in order of creation
+        self.calls = queue.Queue()
+        self.writer = threading.Thread(target=self._write, name="riskrecord")
+        self.writer.daemon = True
+        self.writer.start()
+
+    def log(self, name, args, result, when):
+        if isinstance(result, GraphWin) and id(result) not in self.windows:
+            self.windows[id(result)] = len(self.windows)
+        self.calls.put((when - self.start, name, args, result))
+
+    def _write(self):
+        while True:
+            call = self.calls.get()
+            if call == None:
+                break
+            when, name, args, result = call
+            self.file.write(json.dumps([round(when, 6), name,
+                                        encode(list(args), self.windows),
+                                        encode(result, self.windows)],
+                                       separators=(",", ":")) + "\n")
+            if self.calls.empty():
+                self.file.flush()
+        self.file.close()
+
+    def close(self):
+        self.calls.put(None)
+        self.writer.join()
+
+
+def install(moduleName, filename=None):
+    """Log the calls made to the public functions of the module to
+    filename (RISK_RECORD by default) until the process exits"""
+    module = sys.modules[moduleName]
+    recorder = Recorder(filename or os.environ["RISK_RECORD"])
+    depth = [0] # > 0 while inside a logged call
+
+    def record(name, func):
+        @wraps(func)
+        def recorded(*args):
+            if depth[0]:
+                return func(*args)
+            when = clock()
+            depth[0] = depth[0] + 1
+            try:
+                result = func(*args)
+            finally:
+                depth[0] = depth[0] - 1
+            recorder.log(name, args, result, when)
+            return result
+        return recorded
+
+    for name, value in list(vars(module).items()):
+        if (not name.startswith("_") and callable(value) and
+                getattr(value, "__module__", None) == moduleName and
+                not isinstance(value, type)):
+            setattr(module, name, record(name, value))
+    atexit.register(recorder.close)
+    return recorder
+
+
+def buttonPoint(riskgraphics, answer):
+    # A point inside the button that clicker answered with
+    name, isCountry = answer
+    if isCountry:
+        rect = riskgraphics.countriesDict[name][0]
+    else:
+        rect = riskgraphics.endTurnButton
+    p, q = rect.getP1(), rect.getP2()
+    return Point((p.x + q.x)/2.0, (p.y + q.y)/2.0)
+
+
+def click(win, point):
+    # Scripted clicks reach the window only once it waits for input, so
+    # getMouse, which drops earlier clicks, gets this one
+    win.feedClick(point.getX(), point.getY())
+
+
+def replay(filename, fast=False):
+    """Feed a recorded log back into riskgraphics. Returns the number of
+    calls made and the seconds they took."""
+    import riskgraphics
+    windows = []
+    start = clock()
+    calls = 0
+    with open(filename) as f:
+        for line in f:
+            when, name, args, result = json.loads(line)
+            if not fast:
+                # keep the window alive while waiting for the call's time
+                while clock() - start < when:
+                    graphics.update()
+                    time.sleep(min(0.01, max(0, when - (clock() - start))))
+            args = decode(args, windows)
+            if name == "clicker":
+                answer = decode(result, windows)
+                if answer[0] == "Exit":
+                    break
+                click(args[0], buttonPoint(riskgraphics, answer))
+            elif name == "endgame":
+                click(args[0], Point(50, 50))
+            value = getattr(riskgraphics, name)(*args)
+            if isinstance(value, GraphWin):
+                windows.append(value)
+            calls = calls + 1
+    riskgraphics.flush()
+    return calls, clock() - start
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="replay a riskgraphics log")
+    parser.add_argument("log")
+    parser.add_argument("--fast", action="store_true",
+                        help="do not wait between calls")
+    args = parser.parse_args()
+    calls, seconds = replay(args.log, args.fast)
+    print("{} calls in {:.3f} s".format(calls, seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+# risksim.py
+"""Headless simulation of Big Red R!sk games between AIs
+
+Plays the rules of risk_state.ml and the AI of AI.ml over the Cornell
+board without the window, so that game dynamics (like how the AI
+aggression ratio changes who wins) can be studied over thousands of games.
+A Games object holds many independent games as NumPy arrays (who owns each
+country and how many troops are in it, cards, undeployed troops, ...) and
+advances all of them together, one action per game per step: placing a
+troop, rolling one attack, fortifying or ending a turn. The dice for every
+game attacking in a step are rolled in one batch. Needs NumPy.
+
+    games = risksim.play(2000, [1.2, 1.5, 1.8], seed=1)
+    games.wins()          # games won by each player
+
+    python3 risksim.py --games 2000 --ratio 1.2 --ratio 1.5 [--seed S]
+
+A ratio is what set_ai_ratio in simple.ml makes of the aggression typed in
+(see aggression): the AI attacks when its troops outnumber the defender's
+by more than the ratio.
+
+As in the game:
+
+- players claim countries in turn (AI: a random country of a continent
+  nobody is in yet, else any free country), then place their remaining
+  starting troops one at a time. Placing them already advances the turn
+  counter, so the game lasts 50 less that many rounds.
+- a turn trades in cards (3 of a kind, else one of each) for the current
+  reward, which goes up by 5, adds max(3, countries/3) troops plus the
+  bonus of the continents held, deploys, attacks, earns a card if a
+  country was taken, fortifies, and drops players with no countries left.
+- the game ends when a player holds every country or when 50 turns have
+  been counted; the winner is then whoever holds the most countries.
+
+Where AI.ml and risk_state.ml depend on the order of their lists (which
+country is reinforced or attacked from when several qualify, which card
+set is traded in) the lists are taken in board order, and Unix.time
+randomness is drawn from the seeded generator instead. In the game the
+order of occupied_countries depends on the moves made so far, so those
+choices can differ from the game's, but the rules that make them are the
+same.
+
+benchmarks/sim_reference.py plays the same rules one game at a time and
+checks that the win rates and game lengths agree with these.
+"""
+
+import argparse
+import time
+import numpy
+import odds
+from riskboard import continents, borders
+
+names = [name for continent in continents for name in continent[2]]
+index = dict((name, i) for i, name in enumerate(names))
+N = len(names)
+C = len(continents)
+
+# continent membership, bonuses and sizes
+membership = numpy.zeros((N, C))
+for c, (name, bonus, countries) in enumerate(continents):
+    for country in countries:
+        membership[index[country], c] = 1
+continentOf = membership.argmax(1)
+continentSize = membership.sum(0)
+continentBonus = numpy.array([bonus for name, bonus, countries in continents])
+
+# adjacency, and every (from, to) border in board order for attacks
+adjacency = numpy.zeros((N, N))
+edges = []
+for name in names:
+    for other in borders[name]:
+        adjacency[index[name], index[other]] = 1
+        edges.append((index[name], index[other]))
+edgeFrom = numpy.array([a for a, b in edges])
+edgeTo = numpy.array([b for a, b in edges])
+
+# one roll of the dice: cumulative chances of each outcome and the troops
+# the attacker and defender lose, by [attack dice, defend dice, outcome]
+rollChance = numpy.ones((4, 3, 3))
+rollAttackerLoss = numpy.zeros((4, 3, 3), int)
+rollDefenderLoss = numpy.zeros((4, 3, 3), int)
+for a in range(1, 4):
+    for d in range(1, 3):
+        total = 0.0
+        for k, (lossA, lossD, p) in enumerate(odds.rollOutcomes(a, d)):
+            total = total + p
+            rollChance[a, d, k] = total
+            rollAttackerLoss[a, d, k] = lossA
+            rollDefenderLoss[a, d, k] = lossD
+        rollChance[a, d, k] = 1.0 # no rounding gap at the top
+
+startingTroops = {2: 15, 3: 10, 4: 8}
+maxTurns = 50
+
+# what a game is doing
+START, DEPLOY, ATTACK, OCCUPY, FORTIFY, REDEPLOY, END, DONE = range(8)
+
+
+def aggression(level):
+    """The ratio simple.ml gives an AI for aggression level 0-10"""
+    return 2.0 - level/10.0
+
+
+def checkRatio(ratio):
+    """Return ratio as a float, or raise ValueError if no aggression level
+    gives it (AI ratios run from 1.0 to 2.0)"""
+    ratio = float(ratio)
+    if not aggression(10) <= ratio <= aggression(0):
+        raise ValueError("AI ratios run from 1.0 to 2.0, not {}".format(ratio))
+    return ratio
+
+
+class Games:
+
+    """count games between len(ratios) AIs (2 to 4), the first ratio for
+    Player one and so on. Players are numbered from 0 in the arrays:
+    owner and troops by [game, country], cards by [game, player, shape]."""
+
+    def __init__(self, count, ratios, seed=None):
+        if not 2 <= len(ratios) <= 4:
+            raise ValueError("risk is played by 2 to 4 players")
+        self.count = count
+        self.players = P = len(ratios)
+        self.ratio = numpy.array([checkRatio(r) for r in ratios])
+        self.rng = numpy.random.default_rng(seed)
+        self.owner = numpy.full((count, N), -1, int)
+        self.troops = numpy.zeros((count, N), int)
+        self.cards = numpy.zeros((count, P, 3), int)
+        self.undeployed = numpy.zeros(count, int) # the current player's
+        self.reward = numpy.full(count, 5, int)
+        self.turn = numpy.zeros(count, int) # current player
+        self.turns = numpy.zeros(count, int) # total_turns
+        self.phase = numpy.full(count, START, int)
+        self.before = numpy.zeros(count, int) # countries held before attacking
+        self.taken = numpy.zeros((count, 2), int) # last attack that took a country
+        self.winner = numpy.full(count, -1, int)
+        self.steps = 0
+        self._setup()
+
+    # What the current player of each of games g sees
+
+    def _own(self, g):
+        return self.owner[g] == self.turn[g][:, None]
+
+    def _borderTroops(self, g, own):
+        # enemy troops bordering each country
+        return numpy.where(own, 0, self.troops[g]).dot(adjacency)
+
+    def _reinforceTarget(self, g, own):
+        # ai_next_reinforce: of the frontier countries, each with its need
+        # (enemy troops around it less its own), country_to_reinforce takes
+        # the first that needs more than the first one does, else the first
+        border = self._borderTroops(g, own)
+        frontier = own & (border > 0)
+        need = numpy.where(frontier, border - self.troops[g], -numpy.inf)
+        first = frontier.argmax(1)
+        more = need > need[numpy.arange(len(g)), first][:, None]
+        return numpy.where(more.any(1), more.argmax(1), first)
+
+    def _setup(self):
+        rng = self.rng
+        everything = numpy.arange(self.count)
+        for i in range(N):
+            # reinforce_begin: each player in turn claims a free country
+            occupied = self.owner >= 0
+            emptyContinents = occupied.dot(membership) == 0
+            continent = numpy.where(emptyContinents, rng.random((self.count, C)), -1).argmax(1)
+            inContinent = continentOf[None, :] == continent[:, None]
+            free = numpy.where(emptyContinents.any(1)[:, None], inContinent, ~occupied)
+            country = numpy.where(free, rng.random((self.count, N)), -1).argmax(1)
+            self.owner[everything, country] = i % self.players
+            self.troops[everything, country] = 1
+        # reinforce_occupied_loop: then place the rest one at a time
+        rounds = startingTroops[self.players] - N//self.players
+        for i in range(rounds):
+            for player in range(self.players):
+                self.turn[:] = player
+                target = self._reinforceTarget(everything, self._own(everything))
+                self.troops[everything, target] += 1
+            self.turns += 1
+        self.turn[:] = 0
+
+    def _finish(self, g, winner=None):
+        if winner is None:
+            held = (self.owner[g][:, :, None] == numpy.arange(self.players)).sum(1)
+            winner = held.argmax(1)
+        self.winner[g] = winner
+        self.phase[g] = DONE
+
+    # One action for the games g in each phase
+
+    def _start(self, g):
+        over = self.turns[g] >= maxTurns
+        self._finish(g[over])
+        g = g[~over]
+        p = self.turn[g]
+        # trade_in: three of a kind, else one of each
+        cards = self.cards[g, p]
+        same = cards >= 3
+        hasSame = same.any(1)
+        different = ~hasSame & (cards > 0).all(1)
+        self.cards[g[hasSame], p[hasSame], same[hasSame].argmax(1)] -= 3
+        self.cards[g[different], p[different]] -= 1
+        traded = g[hasSame | different]
+        self.undeployed[traded] += self.reward[traded]
+        self.reward[traded] += 5
+        # give_troops
+        own = self._own(g)
+        held = own.sum(1)
+        bonus = (own.dot(membership) == continentSize).dot(continentBonus)
+        self.undeployed[g] += numpy.maximum(3, held//3) + bonus
+        self.phase[g] = DEPLOY
+
+    def _deploy(self, g, next):
+        own = self._own(g)
+        target = self._reinforceTarget(g, own)
+        self.troops[g, target] += 1
+        self.undeployed[g] -= 1
+        finished = g[self.undeployed[g] == 0]
+        self.phase[finished] = next
+        if next == ATTACK:
+            self.before[finished] = self._own(finished).sum(1)
+
+    def _attack(self, g):
+        rng = self.rng
+        p = self.turn[g]
+        own = self._own(g)
+        troops = self.troops[g]
+        # ai_next_attack: the first border where we outnumber them enough
+        # (and can attack at all, with 2 or more troops)
+        possible = (own[:, edgeFrom] & ~own[:, edgeTo] & (troops[:, edgeFrom] >= 2) &
+                    (troops[:, edgeFrom] > self.ratio[p][:, None]*troops[:, edgeTo]))
+        attacking = possible.any(1)
+        # done attacking: a card if a country was taken, then fortify
+        stop = g[~attacking]
+        won = stop[self._own(stop).sum(1) > self.before[stop]]
+        self.cards[won, self.turn[won], rng.integers(0, 3, len(won))] += 1
+        self.phase[stop] = FORTIFY
+
+        g = g[attacking]
+        edge = possible[attacking].argmax(1)
+        a, d = edgeFrom[edge], edgeTo[edge]
+        attackers, defenders = self.troops[g, a], self.troops[g, d]
+        aDice, dDice = numpy.minimum(attackers - 1, 3), numpy.minimum(defenders, 2)
+        outcome = (rng.random(len(g))[:, None] >= rollChance[aDice, dDice]).sum(1)
+        self.troops[g, a] -= rollAttackerLoss[aDice, dDice, outcome]
+        self.troops[g, d] -= rollDefenderLoss[aDice, dDice, outcome]
+        # taking a country leaves one troop in each, the rest to place
+        taken = self.troops[g, d] == 0
+        g, a, d = g[taken], a[taken], d[taken]
+        self.owner[g, d] = self.turn[g]
+        self.undeployed[g] += self.troops[g, a] - 2
+        self.troops[g, a] = 1
+        self.troops[g, d] = 1
+        self.taken[g, 0] = a
+        self.taken[g, 1] = d
+        everything = self._own(g).all(1)
+        self._finish(g[everything], self.turn[g[everything]])
+        g = g[~everything]
+        self.phase[g[self.undeployed[g] > 0]] = OCCUPY
+
+    def _occupy(self, g):
+        # ai_next_reinforce_after_attack: into whichever of the two
+        # countries is more outnumbered, or the one that borders enemies
+        own = self._own(g)
+        border = self._borderTroops(g, own)
+        a, d = self.taken[g, 0], self.taken[g, 1]
+        borderA, borderD = border[numpy.arange(len(g)), a], border[numpy.arange(len(g)), d]
+        needA = borderA - self.troops[g, a]
+        needD = borderD - self.troops[g, d]
+        target = numpy.where(borderA == 0, d, numpy.where(
+            borderD == 0, a, numpy.where(needA > needD, a, d)))
+        self.troops[g, target] += 1
+        self.undeployed[g] -= 1
+        self.phase[g[self.undeployed[g] == 0]] = ATTACK
+
+    def _fortify(self, g):
+        # ai_next_fortify: pull back all but one troop from the biggest
+        # interior country, then deploy them again
+        own = self._own(g)
+        interior = own & (self._borderTroops(g, own) == 0)
+        troops = numpy.where(interior, self.troops[g], 1)
+        source = troops.argmax(1)
+        moving = troops[numpy.arange(len(g)), source] - 1
+        fortify = moving > 0
+        self.phase[g[~fortify]] = END
+        g, source, moving = g[fortify], source[fortify], moving[fortify]
+        self.undeployed[g] += moving
+        self.troops[g, source] = 1
+        self.phase[g] = REDEPLOY
+
+    def _end(self, g):
+        # remove_player, then next_player, counting a turn on wrapping
+        rows = numpy.arange(len(g))
+        p = self.turn[g]
+        order = (p[:, None] + numpy.arange(1, self.players + 1)) % self.players
+        alive = (self.owner[g][:, :, None] == numpy.arange(self.players)).any(1)
+        following = order[rows, alive[rows[:, None], order].argmax(1)]
+        self.turns[g] += following <= p
+        self.turn[g] = following
+        self.phase[g] = START
+
+    def step(self):
+        """Advance every unfinished game by one action"""
+        phase = self.phase
+        for kind, handle in ((START, self._start),
+                             (DEPLOY, lambda g: self._deploy(g, ATTACK)),
+                             (ATTACK, self._attack), (OCCUPY, self._occupy),
+                             (FORTIFY, self._fortify),
+                             (REDEPLOY, lambda g: self._deploy(g, END)),
+                             (END, self._end)):
+            g = numpy.flatnonzero(phase == kind)
+            if len(g):
+                handle(g)
+        self.steps = self.steps + 1
+
+    def finished(self):
+        return (self.phase == DONE).all()
+
+    def run(self):
+        """Play every game to the end"""
+        while not self.finished():
+            self.step()
+        return self
+
+    def wins(self):
+        """Games won by each player"""
+        return numpy.bincount(self.winner[self.winner >= 0], minlength=self.players)
+
+
+def play(count, ratios, seed=None):
+    """Play count games between AIs with the given ratios to the end"""
+    return Games(count, ratios, seed).run()
+
+
+def ratioArgument(text):
+    # checkRatio for argparse
+    try:
+        return checkRatio(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="simulate AI-only games")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--ratio", type=ratioArgument, action="append",
+                        help="one per player, 1.0 (bold) to 2.0 (cautious)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    ratios = args.ratio or [aggression(5)]*4
+    start = time.time()
+    games = play(args.games, ratios, args.seed)
+    seconds = time.time() - start
+    for player, (ratio, won) in enumerate(zip(ratios, games.wins())):
+        print("player {} (ratio {:.2f}): {:6.1%} of games".format(
+            player + 1, ratio, won/float(args.games)))
+    print("{} games in {:.1f} s ({:.0f} a minute, {} steps), {:.1f} turns on average".format(
+        args.games, seconds, 60*args.games/seconds, games.steps, games.turns.mean()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# risktournament.py
+"""AI self-play tournaments on every core
+
+Sweeps the AI aggression ratio (the ratio field of AI.ml's players) by
+playing every lineup of the given ratios against each other with risksim,
+spread over a pool of worker processes:
+
+    python3 risktournament.py --ratio 1.2 --ratio 1.5 --ratio 1.8 \\
+        --players 3 --games 2000 [--chunk 250] [--seed 0] [--workers N] \\
+        [--out results.json]
+
+Every lineup (one ratio per seat, so seat order is swept too) plays
+--games games, split into chunks of --chunk games. A chunk is one task for
+the pool and is seeded from (--seed, lineup, chunk), so the same arguments
+give the same results whatever the number of workers and the order chunks
+finish in. Workers send back only counts, which are added up as they
+arrive: games won from each seat, game lengths and turn-50 timeouts
+(games nobody won outright before total_turns reached 50). Workers are
+replaced every --tasks-per-worker chunks to keep their memory flat.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+import numpy
+import risksim
+
+
+def lineups(ratios, players):
+    """Every assignment of the ratios to the seats"""
+    return list(itertools.product(ratios, repeat=players))
+
+
+def chunks(lineups, games, chunk, seed):
+    # (lineup number, ratios, chunk number, games in it, seed) for each task
+    for n, ratios in enumerate(lineups):
+        for c, start in enumerate(range(0, games, chunk)):
+            yield n, ratios, c, min(chunk, games - start), seed
+
+
+def playChunk(task):
+    """Play one chunk of games and count the results"""
+    n, ratios, c, count, seed = task
+    games = risksim.play(count, list(ratios), [seed, n, c])
+    lengths = numpy.bincount(games.turns, minlength=risksim.maxTurns + 1)
+    return (n, count, games.wins().tolist(), lengths.tolist(),
+            int((games.turns >= risksim.maxTurns).sum()))
+
+
+class Tally:
+
+    """Results of one lineup, added up chunk by chunk"""
+
+    def __init__(self, ratios):
+        self.ratios = ratios
+        self.games = 0
+        self.wins = [0]*len(ratios)
+        self.lengths = [0]*(risksim.maxTurns + 1) # games by total_turns at the end
+        self.timeouts = 0
+
+    def add(self, count, wins, lengths, timeouts):
+        self.games = self.games + count
+        self.wins = [a + b for a, b in zip(self.wins, wins)]
+        self.lengths = [a + b for a, b in zip(self.lengths, lengths)]
+        self.timeouts = self.timeouts + timeouts
+
+    def meanTurns(self):
+        return sum(t*n for t, n in enumerate(self.lengths))/float(max(1, self.games))
+
+    def report(self):
+        return {"ratios": list(self.ratios), "games": self.games,
+                "wins": self.wins, "meanTurns": self.meanTurns(),
+                "timeouts": self.timeouts, "lengths": self.lengths}
+
+
+def byRatio(tallies):
+    """{ratio: (seats played, games won)} over every lineup"""
+    totals = {}
+    for tally in tallies:
+        for ratio, won in zip(tally.ratios, tally.wins):
+            seats, wins = totals.get(ratio, (0, 0))
+            totals[ratio] = (seats + tally.games, wins + won)
+    return totals
+
+
+def run(ratios, players, games, chunk=250, seed=0, workers=None,
+        tasksPerWorker=20, progress=None):
+    """Play the tournament and return a Tally for each lineup. progress,
+    if given, is called with (games done, games in all) as chunks finish.
+    Raises ValueError for a ratio no AI can have, before any game starts."""
+    ratios = [risksim.checkRatio(r) for r in ratios]
+    matches = lineups(ratios, players)
+    tallies = [Tally(r) for r in matches]
+    tasks = chunks(matches, games, chunk, seed)
+    total = games*len(matches)
+    done = 0
+    if workers == 1:
+        results = map(playChunk, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, maxtasksperchild=tasksPerWorker)
+        results = pool.imap_unordered(playChunk, tasks)
+    try:
+        for n, count, wins, lengths, timeouts in results:
+            tallies[n].add(count, wins, lengths, timeouts)
+            done = done + count
+            if progress:
+                progress(done, total)
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+    return tallies
+
+
+def printReport(tallies):
+    print("{:<24} {:>7} {:<32} {:>6} {:>9}".format(
+        "ratios", "games", "won from each seat", "turns", "timeouts"))
+    for tally in tallies:
+        print("{:<24} {:>7} {:<32} {:6.1f} {:9.1%}".format(
+            " ".join("{:.2f}".format(r) for r in tally.ratios), tally.games,
+            " ".join("{:6.1%}".format(w/float(tally.games)) for w in tally.wins),
+            tally.meanTurns(), tally.timeouts/float(tally.games)))
+    print("")
+    print("{:<8} {:>9} {:>9}".format("ratio", "seats", "won"))
+    for ratio, (seats, wins) in sorted(byRatio(tallies).items()):
+        print("{:<8.2f} {:>9} {:9.1%}".format(ratio, seats, wins/float(seats)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI self-play tournament")
+    parser.add_argument("--ratio", type=risksim.ratioArgument, action="append",
+                        required=True,
+                        help="a ratio to include, 1.0 (bold) to 2.0 (cautious)")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--games", type=int, default=1000, help="per lineup")
+    parser.add_argument("--chunk", type=int, default=250, help="games per task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    parser.add_argument("--tasks-per-worker", type=int, default=20)
+    parser.add_argument("--out", help="write the results here as JSON")
+    args = parser.parse_args()
+
+    def progress(done, total):
+        sys.stderr.write("\r{}/{} games".format(done, total))
+        sys.stderr.flush()
+    start = time.time()
+    tallies = run(args.ratio, args.players, args.games, args.chunk, args.seed,
+                  args.workers, args.tasks_per_worker, progress)
+    seconds = time.time() - start
+    sys.stderr.write("\n")
+    printReport(tallies)
+    games = sum(t.games for t in tallies)
+    print("\n{} games in {:.1f} s ({:.0f} a minute) on {} workers".format(
+        games, seconds, 60*games/seconds, args.workers or multiprocessing.cpu_count()))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"meta": {"players": args.players, "games": args.games,
+                                "chunk": args.chunk, "seed": args.seed},
+                       "lineups": [t.report() for t in tallies]},
+                      f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -62,29 +62,66 @@ let rec roll_to_python (intlist: int list) acc =
 
 (********** Call Python Graphics **********)
 
+(* Drawing calls are posted: riskgraphics queues them and returns at once,
+   and draws them in order at most once a frame, before the next click is
+   read, and when flushed. Posting or flushing returns false once the window
+   has been closed, which quits the game. *)
+let quit_closed () =
+  Pervasives.print_endline "\nYou've quit Big Red Risk..."; exit 0
+
+let post command args =
+  if not (get_bool riskgraphics "post" [Pystr command; Pylist args])
+  then quit_closed ()
+
+(* Draws everything posted so far, then waits [seconds] *)
+let pause seconds =
+  if not (get_bool riskgraphics "flush" []) then quit_closed ();
+  Unix.sleep seconds
+
 (* Updates the riskgraphics of board with the current click*)
 let update_board_with_click the_state clicked notification=
   match clicked with
   | Pytuple [Pystr str; Pybool b] ->
-    call riskgraphics "updateBoard"
+    post "updateBoard"
       [board;clicked;get_country_tuple the_state.occupied_countries str;
        card_amounts_python the_state.active_players [];Pyint the_state.reward;
        Pyint the_state.total_turns;dice_results;
        Pystr the_state.player_turn.player_id;notification];
   | _ -> failwith "Should not be here3"
 
+(* Updates the riskgraphics of board with the click on [clicked], picked as
+   the country to attack from [source], and shows the odds of the battle *)
+let update_board_target the_state source clicked notification =
+  match clicked with
+  | Pytuple [Pystr str; Pybool b] ->
+    post "updateTarget"
+      [board;Pystr source;clicked;
+       get_country_tuple the_state.occupied_countries str;
+       card_amounts_python the_state.active_players [];Pyint the_state.reward;
+       Pyint the_state.total_turns;dice_results;
+       Pystr the_state.player_turn.player_id;notification];
+  | _ -> failwith "Should not be here5"
+
 (* Updates the riskgraphics of board without a click*)
 let update_board_no_click the_state notification =
-  call riskgraphics "updateBoardNoClick"
+  post "updateBoardNoClick"
     [board;Pynone;card_amounts_python the_state.active_players [];
      Pyint the_state.reward;Pyint the_state.total_turns;dice_results;
      Pystr the_state.player_turn.player_id;notification]
 
+(* Repaints every country on the board in a single call *)
+let update_board_snapshot the_state notification =
+  post "applySnapshot"
+    [board;occupied_countries_python the_state.occupied_countries [];
+     card_amounts_python the_state.active_players [];
+     Pyint the_state.reward;Pyint the_state.total_turns;
+     Pystr the_state.player_turn.player_id;notification]
+
 (* Update board graphics after attacks *)
 let update_board_attack the_state clicked1 clicked2 notification =
   match clicked1,clicked2 with
   | Pytuple [Pystr str1; Pybool b1], Pytuple [Pystr str2; Pybool b2] ->
-    call riskgraphics "updateAttack"
+    post "updateAttack"
       [board;clicked1;get_country_tuple the_state.occupied_countries str1;
        get_country_tuple the_state.occupied_countries str2;
        card_amounts_python the_state.active_players [];Pyint the_state.reward;
@@ -94,17 +131,15 @@ let update_board_attack the_state clicked1 clicked2 notification =
 
 (* Update board graphics to show the dice roll *)
 let update_dice attdice defdice =
-  try
-  (call riskgraphics "updateDice"
-     [roll_to_python attdice [];roll_to_python defdice [];board])
-  with _ -> (Pervasives.print_endline "\nYou've quit Big Red Risk..."; exit 0)
+  post "updateDice"
+    [roll_to_python attdice [];roll_to_python defdice [];board]
 
 let update_notification (notification) =
-  call riskgraphics "updateNotificationBar" [notification]
+  post "updateNotificationBar" [notification]
 let end_game_state (winner) =
   call riskgraphics "endgame" [board;Pystr winner]
 let update_done_highlight (inputTuple) =
-  call riskgraphics "updateOutlines" [inputTuple]
+  post "updateOutlines" [inputTuple]
 
 (********** Call Python Graphics End **********)
 
@@ -309,7 +344,8 @@ let rec get_click_two st clicked1 clicked1string =
   else if owns_country clicked2string st.occupied_countries st.player_turn=true
   then (update_board_with_click st clicked2 (attack_notification_from st);
         get_click_two st clicked2 clicked2string)
-  else (update_board_with_click st clicked2 (attack_notification_from st);
+  else (update_board_target st clicked1string clicked2
+          (attack_notification_from st);
         ((clicked2, clicked2string),(clicked1,clicked1string)))
 
 (* Simulates dice roll and returns a tuple that shows who lost how many troops*)
@@ -341,8 +377,8 @@ let rec attack_loop st = Random.init (int_of_float (Unix.time ()));
     else let num_attackers = get_num_troops next_attack st.occupied_countries in
       update_board_with_click st (Pytuple [Pystr next_attack; Pybool true])
         (attack_notification_to st);
-      update_board_with_click st (Pytuple [Pystr next_defender; Pybool true])
-        (attack_notification_to st);
+      update_board_target st next_attack
+        (Pytuple [Pystr next_defender; Pybool true]) (attack_notification_to st);
       let num_defenders = get_num_troops next_defender st.occupied_countries in
       let loser_lost = roll_dice num_attackers num_defenders in
       let cmd = make_attack_command next_attack next_defender
@@ -426,9 +462,9 @@ let rec repl st has_won =
   if (has_won || st.total_turns = 50) then
     end_game_state (fst (get_winner st.active_players st
                            (List.hd st.active_players, 0))).player_id else
-    ((update_board_no_click st (Pystr "")); let st' = build_continent_list st in
+    ((update_board_snapshot st (Pystr "")); let st' = build_continent_list st in
      let st1 = trade_in st' in
-     (update_board_no_click st1 (cash_in_notification st1)); Unix.sleep 2;
+     (update_board_no_click st1 (cash_in_notification st1)); pause 2;
      let st1' = give_troops st1 in
      update_notification (reinforce_notification st1');
      let st2 = midgame_reinforce_loop (st1') in
@@ -437,11 +473,11 @@ let rec repl st has_won =
      then repl st3 true else let st4 = give_card st2 st3 in
        (if st3 = st4 then update_board_no_click st4 (Pystr "") else
           (update_board_no_click st4 (earn_card_notification st4);
-           Unix.sleep 2)); let st5 = fortify_loop st4 in
+           pause 2)); let st5 = fortify_loop st4 in
        (update_board_no_click st4) (Pystr ""); let st6 = remove_player st5 in
        (if st5 = st6 then update_board_no_click st6 (Pystr "") else
           (update_board_no_click st6 (eliminated_notification st6);
-           Unix.sleep 2)); let st7 = next_player st6 in
+           pause 2)); let st7 = next_player st6 in
        (update_board_no_click st7) (next_turn_notification st7);
        let won = check_if_win st7 in repl st7 won)
 